@@ -125,12 +125,22 @@ CREATE TABLE dim_customer (
 );
 
 -- 5. Fact Sales
+-- Output --basket-size > 1 punya kolom line_number setelah transaction_id:
+-- jalankan dengan psql -v line_items=1 -f 02_load_data_to_postgres.sql
+-- Output --time-grain hour punya kolom hour_id di akhir (minute: hour_id dan minute_id):
+-- jalankan dengan psql -v time_grain_hour=1 (atau -v time_grain_minute=1)
+\if :{?time_grain_minute}
+\set time_grain_hour 1
+\endif
 CREATE TABLE fact_sales (
     time_id_old INTEGER,
     product_id INTEGER,
     store_id INTEGER,
     customer_id TEXT, -- Terima string seperti "2158.0" atau ""
     transaction_id VARCHAR(100),
+\if :{?line_items}
+    line_number INTEGER,
+\endif
     sales_person_id INTEGER,
     sales_person_name VARCHAR(255),
     quantity INTEGER,
@@ -161,6 +171,12 @@ CREATE TABLE fact_sales (
     net_amount TEXT,
     tax_amount TEXT,
     gross_amount TEXT
+\if :{?time_grain_hour}
+    , hour_id INTEGER
+\endif
+\if :{?time_grain_minute}
+    , minute_id INTEGER
+\endif
 );
 
 
@@ -229,3 +245,179 @@ JOIN dim_time dt ON fs.time_id_old = dt.day_of_month -- Sesuaikan join key jika
 GROUP BY dt.year, dt.month_name
 ORDER BY dt.year DESC, dt.month_name;
 
+
+
+-- 7. Rollup Tables (opsional, dibuat oleh generate_dummy_data.py --rollups)
+-- Sudah teragregasi saat generate, jadi dashboard tidak perlu GROUP BY ke fact_sales
+-- Hanya dimuat bila dijalankan dengan psql -v rollups=1
+\if :{?rollups}
+DROP TABLE IF EXISTS agg_sales_daily_store CASCADE;
+DROP TABLE IF EXISTS agg_sales_daily_product CASCADE;
+DROP TABLE IF EXISTS agg_sales_monthly_category CASCADE;
+
+CREATE TABLE agg_sales_daily_store (
+    time_id INTEGER,
+    store_id INTEGER,
+    transaction_count BIGINT,
+    quantity BIGINT,
+    total_amount NUMERIC,
+    discount_amount NUMERIC,
+    net_amount NUMERIC,
+    tax_amount NUMERIC,
+    gross_amount NUMERIC,
+    PRIMARY KEY (time_id, store_id)
+);
+
+CREATE TABLE agg_sales_daily_product (
+    time_id INTEGER,
+    product_id INTEGER,
+    transaction_count BIGINT,
+    quantity BIGINT,
+    total_amount NUMERIC,
+    discount_amount NUMERIC,
+    net_amount NUMERIC,
+    tax_amount NUMERIC,
+    gross_amount NUMERIC,
+    PRIMARY KEY (time_id, product_id)
+);
+
+CREATE TABLE agg_sales_monthly_category (
+    month_start DATE,
+    category_name VARCHAR(100),
+    transaction_count BIGINT,
+    quantity BIGINT,
+    total_amount NUMERIC,
+    discount_amount NUMERIC,
+    net_amount NUMERIC,
+    tax_amount NUMERIC,
+    gross_amount NUMERIC,
+    PRIMARY KEY (month_start, category_name)
+);
+
+COPY agg_sales_daily_store FROM '/tmp/data/agg_sales_daily_store.csv' WITH (FORMAT CSV, HEADER TRUE, QUOTE '"', NULL '');
+COPY agg_sales_daily_product FROM '/tmp/data/agg_sales_daily_product.csv' WITH (FORMAT CSV, HEADER TRUE, QUOTE '"', NULL '');
+COPY agg_sales_monthly_category FROM '/tmp/data/agg_sales_monthly_category.csv' WITH (FORMAT CSV, HEADER TRUE, QUOTE '"', NULL '');
+
+ANALYZE agg_sales_daily_store;
+ANALYZE agg_sales_daily_product;
+ANALYZE agg_sales_monthly_category;
+
+-- Contoh: revenue bulanan per kategori langsung dari rollup
+SELECT
+    month_start,
+    category_name,
+    transaction_count,
+    net_amount,
+    gross_amount
+FROM agg_sales_monthly_category
+ORDER BY month_start, gross_amount DESC;
+\endif
+
+
+
+-- 8. Time Grain Tables (opsional, dibuat oleh generate_dummy_data.py --time-grain hour/minute)
+-- Hanya dimuat bila dijalankan dengan psql -v time_grain_hour=1 atau -v time_grain_minute=1,
+-- yang juga menambahkan hour_id (dan minute_id) ke fact_sales di bagian 5
+\if :{?time_grain_hour}
+DROP TABLE IF EXISTS dim_time_hour CASCADE;
+DROP TABLE IF EXISTS dim_time_minute CASCADE;
+
+CREATE TABLE dim_time_hour (
+    hour_id INTEGER PRIMARY KEY,
+    time_id INTEGER,
+    full_date DATE,
+    hour INTEGER,
+    day_part VARCHAR(20),
+    is_weekend BOOLEAN,
+    is_holiday BOOLEAN
+);
+
+\if :{?time_grain_minute}
+CREATE TABLE dim_time_minute (
+    minute_id INTEGER PRIMARY KEY,
+    hour_id INTEGER,
+    time_id INTEGER,
+    full_date DATE,
+    hour INTEGER,
+    minute INTEGER,
+    day_part VARCHAR(20),
+    is_weekend BOOLEAN,
+    is_holiday BOOLEAN
+);
+\endif
+
+COPY dim_time_hour FROM '/tmp/data/dim_time_hour.csv' WITH (FORMAT CSV, HEADER TRUE, QUOTE '"', NULL '');
+ANALYZE dim_time_hour;
+\if :{?time_grain_minute}
+COPY dim_time_minute FROM '/tmp/data/dim_time_minute.csv' WITH (FORMAT CSV, HEADER TRUE, QUOTE '"', NULL '');
+ANALYZE dim_time_minute;
+\endif
+
+-- Contoh: transaksi per jam, dipisah hari kerja dan akhir pekan
+SELECT
+    h.hour,
+    h.day_part,
+    h.is_weekend,
+    COUNT(*) AS transaction_count,
+    SUM(fs.total_amount) AS total_revenue
+FROM fact_sales fs
+JOIN dim_time_hour h ON fs.hour_id = h.hour_id
+GROUP BY h.hour, h.day_part, h.is_weekend
+ORDER BY h.is_weekend, h.hour;
+\endif
+
+
+
+-- 9. Order Header (opsional, dibuat oleh generate_dummy_data.py --basket-size 3 --order-headers)
+-- Dengan --basket-size > 1 satu transaksi punya beberapa baris (line item) di fact_sales,
+-- jadi jalankan script ini dengan psql -v line_items=1 (lihat bagian 5 di atas)
+-- Hanya dimuat bila dijalankan dengan psql -v order_headers=1
+\if :{?order_headers}
+DROP TABLE IF EXISTS fact_order_header CASCADE;
+
+CREATE TABLE fact_order_header (
+    transaction_id VARCHAR(100) PRIMARY KEY,
+    time_id INTEGER,
+    store_id INTEGER,
+    customer_id TEXT, -- sama seperti fact_sales: "2158.0" atau ""
+    sales_person_id INTEGER,
+    sales_person_name VARCHAR(255),
+    payment_method VARCHAR(50),
+    payment_status VARCHAR(50),
+    card_type VARCHAR(50),
+    card_last_four VARCHAR(10),
+    sales_channel VARCHAR(50),
+    online_order_id VARCHAR(100),
+    transaction_time TEXT,
+    source_system VARCHAR(50),
+    batch_id INTEGER,
+    line_count INTEGER,
+    quantity INTEGER,
+    total_amount NUMERIC,
+    discount_amount NUMERIC,
+    net_amount NUMERIC,
+    tax_amount NUMERIC,
+    service_fee NUMERIC, -- biaya per transaksi, di fact_sales hanya ada di line pertama
+    shipping_fee NUMERIC,
+    gross_amount NUMERIC
+);
+
+COPY fact_order_header FROM '/tmp/data/fact_order_header.csv' WITH (FORMAT CSV, HEADER TRUE, QUOTE '"', NULL '');
+
+-- Type casting sama seperti fact_sales di bagian 2
+ALTER TABLE fact_order_header
+    ALTER COLUMN customer_id TYPE NUMERIC USING (NULLIF(customer_id, '')::NUMERIC),
+    ALTER COLUMN transaction_time TYPE TIMESTAMP USING (NULLIF(transaction_time, '')::TIMESTAMP);
+
+ANALYZE fact_order_header;
+
+-- Contoh: distribusi ukuran keranjang per channel
+SELECT
+    sales_channel,
+    line_count,
+    COUNT(*) AS transaction_count,
+    AVG(gross_amount) AS avg_order_value
+FROM fact_order_header
+GROUP BY sales_channel, line_count
+ORDER BY sales_channel, line_count;
+\endif
@@ -0,0 +1,133 @@
+-- query set untuk benchmark_queries.py
+-- setiap query diawali baris "-- name: <nama>", tanpa titik koma di akhir
+
+
+-- name: monthly_revenue_by_category
+select
+	date_trunc('month', fs.transaction_time) as month,
+	p.category_name,
+	count(*) as transaction_count,
+	sum(fs.net_amount) as net_revenue
+from fact_sales fs
+join dim_product p on fs.product_id = p.product_id
+group by date_trunc('month', fs.transaction_time), p.category_name
+order by month, net_revenue desc
+
+
+-- name: store_revenue_one_week
+select
+	s.store_name,
+	s.city,
+	sum(fs.gross_amount) as gross_revenue
+from fact_sales fs
+join dim_store s on fs.store_id = s.store_id
+where fs.transaction_time >= '2023-06-05' and fs.transaction_time < '2023-06-12'
+group by s.store_name, s.city
+order by gross_revenue desc
+
+
+-- name: top_products_by_net_amount
+select
+	p.product_name,
+	p.brand,
+	sum(fs.quantity) as units_sold,
+	sum(fs.net_amount) as net_revenue
+from fact_sales fs
+join dim_product p on fs.product_id = p.product_id
+group by p.product_id, p.product_name, p.brand
+order by net_revenue desc
+limit 10
+
+
+-- name: revenue_by_customer_segment
+select
+	c.customer_segment,
+	count(distinct fs.customer_id) as customers,
+	sum(fs.net_amount) as net_revenue,
+	avg(fs.net_amount) as avg_net_amount
+from fact_sales fs
+join dim_customer c on fs.customer_id = c.customer_id
+group by c.customer_segment
+order by net_revenue desc
+
+
+-- name: store_running_total
+with daily_store as (
+	select
+		store_id,
+		transaction_time::date as sale_date,
+		sum(net_amount) as net_revenue
+	from fact_sales
+	group by store_id, transaction_time::date
+)
+select
+	store_id,
+	sale_date,
+	net_revenue,
+	sum(net_revenue) over (partition by store_id order by sale_date) as running_revenue
+from daily_store
+order by store_id, sale_date
+
+
+-- name: weekend_vs_weekday
+select
+	dt.is_weekend,
+	count(*) as transaction_count,
+	sum(fs.net_amount) as net_revenue
+from fact_sales fs
+join dim_time dt on fs.transaction_time::date = dt.full_date
+group by dt.is_weekend
+
+
+-- name: customer_purchase_history
+select
+	transaction_id,
+	transaction_time,
+	product_id,
+	net_amount
+from fact_sales
+where customer_id = 42
+order by transaction_time desc
+
+
+-- name: online_returns
+select
+	return_reason,
+	count(*) as returns,
+	sum(refund_amount) as refunded
+from fact_sales
+where sales_channel = 'Online' and is_returned
+group by return_reason
+order by returns desc
+
+
+-- name: order_value_by_basket_size
+-- per-order aggregation: GROUP BY transaction_id atas line item fact_sales
+with orders as (
+	select
+		transaction_id,
+		count(*) as line_count,
+		sum(gross_amount) as order_value
+	from fact_sales
+	group by transaction_id
+)
+select
+	line_count,
+	count(*) as orders,
+	avg(order_value) as avg_order_value
+from orders
+group by line_count
+order by line_count
+
+
+-- name: frequently_bought_together
+-- basket analysis: pasangan produk dalam transaksi yang sama
+select
+	a.product_id as product_a,
+	b.product_id as product_b,
+	count(*) as baskets
+from fact_sales a
+join fact_sales b on a.transaction_id = b.transaction_id and a.product_id < b.product_id
+group by a.product_id, b.product_id
+order by baskets desc
+limit 20
@@ -0,0 +1,14 @@
+-- index set untuk dibandingkan oleh benchmark_queries.py --index-set
+-- (ditambahkan di atas primary key dan index foreign key bawaan generator)
+
+-- range scan berdasarkan waktu transaksi
+create index idx_fact_sales_transaction_time on fact_sales(transaction_time);
+
+-- composite index: riwayat pembelian per customer, sudah terurut
+create index idx_fact_sales_customer_time on fact_sales(customer_id, transaction_time);
+
+-- covering index untuk agregasi per store dan hari
+create index idx_fact_sales_store_time on fact_sales(store_id, transaction_time) include (net_amount, gross_amount);
+
+-- partial index: hanya baris yang diretur
+create index idx_fact_sales_online_returns on fact_sales(sales_channel, return_reason) where is_returned;
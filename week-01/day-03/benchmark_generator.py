@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Benchmark Script for the Retail Sales Data Generator
+Times each generation stage at several scale factors and flags regressions
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime
+
+# generate_dummy_data imports these inside the functions that use them;
+# load them here so the first timed stage does not pay for the import
+import numpy  # noqa: F401
+import pandas  # noqa: F401
+
+from generate_dummy_data import DataGenerator
+
+STAGES = ['dim_time', 'dim_product', 'dim_store', 'dim_customer', 'fact_sales', 'csv_write']
+
+# Settings a baseline must share for its rows/sec to be comparable, with the
+# value assumed for baselines saved before the setting was recorded
+COMPARABLE_SETTINGS = {'engine': None, 'basket_size': 1, 'date_range': None}
+
+
+def run_stage(instrumentation, results, scale_factor, stage, func, count_rows):
+    """Run one stage under instrumentation and record its throughput, memory and output size"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        with instrumentation.stage(stage) as record:
+            value = func()
+            record['rows'] = count_rows(value)
+    
+    results.append({'scale_factor': scale_factor, **record})
+    print(f"  SF{scale_factor:<6g} {stage:<14} {record['rows']:>10,} rows  {record['seconds']:8.3f}s  "
+          f"{record['rows_per_sec'] or 0:>12,.0f} rows/sec  peak RSS so far {record['cumulative_peak_rss_mb']:,.0f} MB")
+    return value
+
+
+def benchmark_scale_factor(args, scale_factor):
+    """Run every stage once at one scale factor inside a scratch directory"""
+    results = []
+    generator = DataGenerator(
+        args.start_date,
+        args.end_date,
+        engine=args.engine,
+        seed=args.seed,
+        scale_factor=scale_factor
+    )
+    # Progress lines only add noise to timed runs
+    generator.progress = False
+    generator.basket_size = args.basket_size
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            os.makedirs('data')
+            # Stage timings, bytes written to data/ and memory, as in a normal run;
+            # the generator's own instrumentation counts the bytes it writes
+            instrumentation = generator.instrumentation
+            run_stage(instrumentation, results, scale_factor, 'dim_time', generator.generate_dim_time, len)
+            products = run_stage(instrumentation, results, scale_factor, 'dim_product', generator.generate_dim_product, len)
+            stores = run_stage(instrumentation, results, scale_factor, 'dim_store', generator.generate_dim_store, len)
+            customers = run_stage(instrumentation, results, scale_factor, 'dim_customer', generator.generate_dim_customer, len)
+
+            # Fact generation and the CSV write are timed separately
+            def generate_fact_chunks():
+                if generator.engine == 'numpy':
+                    chunks = generator._iter_fact_sales_numpy(products, stores, customers)
+                else:
+                    chunks = generator._iter_fact_sales_python(products, stores, customers)
+                return [generator._add_derived_columns(df) for df in chunks]
+
+            def write_fact_chunks():
+                for chunk_index, df in enumerate(chunks):
+                    generator._write_fact_chunk(df, chunk_index)
+                return chunks
+
+            def count_chunk_rows(value):
+                return sum(len(df) for df in value)
+
+            chunks = run_stage(instrumentation, results, scale_factor, 'fact_sales', generate_fact_chunks, count_chunk_rows)
+            run_stage(instrumentation, results, scale_factor, 'csv_write', write_fact_chunks, count_chunk_rows)
+        finally:
+            os.chdir(cwd)
+
+    return results
+
+
+def compare_to_baseline(results, baseline, threshold, min_seconds):
+    """Return the stages whose throughput fell more than threshold below baseline"""
+    baseline_rows = {
+        (r['scale_factor'], r['stage']): r for r in baseline['results']
+    }
+    regressions = []
+    for result in results:
+        base = baseline_rows.get((result['scale_factor'], result['stage']))
+        # Stages that finish almost instantly are too noisy to compare
+        if not base or not base['rows_per_sec'] or base['seconds'] < min_seconds:
+            continue
+        # No rows, no throughput
+        if result['rows_per_sec'] is None:
+            continue
+        change = result['rows_per_sec'] / base['rows_per_sec'] - 1
+        if change < -threshold:
+            regressions.append((result, base, change))
+    return regressions
+
+
+def main():
+    """Main function to run the generator benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark DataGenerator stages at several scale factors')
+    parser.add_argument('--scale-factors', type=float, nargs='+', default=[0.1, 1.0],
+                        help='scale factors to run, relative to the default table sizes')
+    parser.add_argument('--engine', choices=['python', 'numpy'], default='numpy')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--basket-size', type=float, default=1,
+                        help='mean line items per transaction; fact_sales rows/sec counts line items')
+    parser.add_argument('--start-date', default='2023-01-01')
+    parser.add_argument('--end-date', default='2024-02-28')
+    parser.add_argument('--output', help='where to save results as JSON (default: benchmarks/results-<timestamp>.json)')
+    parser.add_argument('--baseline', help='previous results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='fail when rows/sec drops by more than this fraction (default 0.2)')
+    parser.add_argument('--min-seconds', type=float, default=0.05,
+                        help='skip comparing stages that took less than this in the baseline')
+    args = parser.parse_args()
+    if args.basket_size < 1:
+        parser.error('--basket-size must be at least 1')
+    if args.basket_size > 1 and args.engine != 'numpy':
+        parser.error('--basket-size above 1 requires --engine numpy')
+
+    settings = {'engine': args.engine, 'basket_size': args.basket_size, 'date_range': [args.start_date, args.end_date]}
+    baseline = None
+    if args.baseline:
+        # Check before running, not after minutes of benchmarking
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        mismatched = [
+            f"{key} {baseline.get(key, default)} (now {settings[key]})"
+            for key, default in COMPARABLE_SETTINGS.items() if baseline.get(key, default) != settings[key]
+        ]
+        if mismatched:
+            parser.error(f"--baseline {args.baseline} was run with a different {', '.join(mismatched)}")
+
+    print("Retail Sales Data Mart - Generator Benchmark")
+    print("="*50)
+    print(f"Engine: {args.engine}, scale factors: {args.scale_factors}\n")
+
+    results = []
+    for scale_factor in args.scale_factors:
+        results.extend(benchmark_scale_factor(args, scale_factor))
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        **settings,
+        'seed': args.seed,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results
+    }
+
+    output = args.output or f"benchmarks/results-{datetime.now():%Y%m%d-%H%M%S}.json"
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📈 Results saved to: {output}")
+
+    if baseline:
+        regressions = compare_to_baseline(results, baseline, args.threshold, args.min_seconds)
+        if regressions:
+            print(f"\n❌ {len(regressions)} stage(s) regressed by more than {args.threshold:.0%}:")
+            for result, base, change in regressions:
+                print(f"  • SF{result['scale_factor']:g} {result['stage']}: "
+                      f"{base['rows_per_sec']:,.0f} -> {result['rows_per_sec']:,.0f} rows/sec ({change:+.1%})")
+            sys.exit(1)
+        print(f"\n✅ No stage regressed by more than {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+SQL Workload Benchmark for the Retail Sales Star Schema
+Generates and loads data into PostgreSQL at a scale factor, runs a named
+query set several times and compares it with and without an index set
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from generate_dummy_data import DataGenerator
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_queries(path):
+    """Named queries from a SQL file where each query follows a '-- name: <name>' line"""
+    queries = {}
+    name = None
+    with open(path) as f:
+        for line in f:
+            if line.startswith('-- name:'):
+                name = line.split(':', 1)[1].strip()
+                queries[name] = []
+            elif name:
+                queries[name].append(line)
+    return {name: ''.join(lines).strip().rstrip(';') for name, lines in queries.items()}
+
+
+def load_statements(path):
+    """Statements of a SQL file, split on ';' with comment lines removed"""
+    with open(path) as f:
+        sql = ''.join(line for line in f if not line.lstrip().startswith('--'))
+    return [statement.strip() for statement in sql.split(';') if statement.strip()]
+
+
+def generate_and_load(args):
+    """Generate the star schema at args.scale_factor straight into PostgreSQL"""
+    generator = DataGenerator(
+        args.start_date,
+        args.end_date,
+        engine=args.engine,
+        seed=args.seed,
+        scale_factor=args.scale_factor
+    )
+    generator.output = 'postgres'
+    generator.dsn = args.dsn
+    generator.basket_size = args.basket_size
+    generator.streaming = True
+    generator.progress = False
+
+    print(f"🐘 Loading SF{args.scale_factor:g} ({generator.num_transactions:,} transactions) into PostgreSQL...")
+    start = time.perf_counter()
+    # The generator also writes statistics files; keep them out of the repo
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                generator.generate_all_data()
+        finally:
+            os.chdir(cwd)
+    print(f"  loaded in {time.perf_counter() - start:.1f}s\n")
+
+
+def plan_shape(node):
+    """Compact plan tree, e.g. 'Sort(HashAggregate(Hash Join(Seq Scan fact_sales, Hash(...))))'"""
+    label = node['Node Type']
+    if 'Index Name' in node:
+        label += f" {node['Index Name']}"
+    elif 'Relation Name' in node:
+        label += f" {node['Relation Name']}"
+    children = node.get('Plans', [])
+    if children:
+        label += '(' + ', '.join(plan_shape(child) for child in children) + ')'
+    return label
+
+
+def explain(cur, sql):
+    """Plan shape, timings and buffer counts from one EXPLAIN (ANALYZE, BUFFERS) run"""
+    cur.execute(f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}')
+    result = cur.fetchone()[0]
+    if isinstance(result, str):
+        result = json.loads(result)
+    plan = result[0]
+    top = plan['Plan']
+    return {
+        'plan': plan_shape(top),
+        'planning_ms': round(plan.get('Planning Time', 0.0), 3),
+        'execution_ms': round(plan['Execution Time'], 3),
+        'shared_hit_blocks': top.get('Shared Hit Blocks', 0),
+        'shared_read_blocks': top.get('Shared Read Blocks', 0),
+        'temp_written_blocks': top.get('Temp Written Blocks', 0)
+    }
+
+
+def time_query(cur, sql, runs, warmup):
+    """Client-side latency in ms of each of runs executions, after warmup ones"""
+    latencies = []
+    for k in range(warmup + runs):
+        start = time.perf_counter()
+        cur.execute(sql)
+        cur.fetchall()
+        if k >= warmup:
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def run_query_set(conn, queries, args, label):
+    """Time and explain every query; label names the index set in effect"""
+    results = []
+    print(f"⏱️  Query set with {label}:")
+    with conn.cursor() as cur:
+        for name, sql in queries.items():
+            latencies = time_query(cur, sql, args.runs, args.warmup)
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            result = {
+                'index_set': label,
+                'query': name,
+                'runs': args.runs,
+                'p50_ms': round(p50, 3),
+                'p95_ms': round(p95, 3),
+                'p99_ms': round(p99, 3),
+                'mean_ms': round(float(np.mean(latencies)), 3),
+                'min_ms': round(min(latencies), 3),
+                'max_ms': round(max(latencies), 3)
+            }
+            result.update(explain(cur, sql))
+            results.append(result)
+            print(f"  {name:<30} p50 {p50:9.2f} ms  p95 {p95:9.2f} ms  "
+                  f"hit {result['shared_hit_blocks']:>8,}  read {result['shared_read_blocks']:>8,}")
+    return results
+
+
+def public_indexes(cur):
+    cur.execute("SELECT indexname FROM pg_indexes WHERE schemaname = 'public'")
+    return {row[0] for row in cur.fetchall()}
+
+
+def apply_index_set(conn, statements):
+    """Run the index set and return the names of the indexes it created"""
+    with conn.cursor() as cur:
+        before = public_indexes(cur)
+        start = time.perf_counter()
+        for statement in statements:
+            cur.execute(statement)
+        cur.execute('ANALYZE')
+        created = sorted(public_indexes(cur) - before)
+    print(f"\n🔧 Created {len(created)} index(es) in {time.perf_counter() - start:.2f}s: {', '.join(created)}\n")
+    return created
+
+
+def drop_indexes(conn, names):
+    with conn.cursor() as cur:
+        for name in names:
+            cur.execute(f'DROP INDEX IF EXISTS {name}')
+        cur.execute('ANALYZE')
+
+
+def compare_index_sets(without, with_indexes):
+    """Print p50 latency and plan changes per query between the two runs"""
+    print(f"\n📊 Index set comparison (p50):")
+    baseline = {r['query']: r for r in without}
+    for result in with_indexes:
+        base = baseline[result['query']]
+        change = result['p50_ms'] / base['p50_ms'] - 1 if base['p50_ms'] else 0.0
+        plan_note = 'plan changed' if result['plan'] != base['plan'] else 'same plan'
+        print(f"  • {result['query']:<30} {base['p50_ms']:9.2f} -> {result['p50_ms']:9.2f} ms "
+              f"({change:+.1%}, {plan_note})")
+
+
+def main():
+    """Main function to run the SQL workload benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark the star schema query set in PostgreSQL')
+    parser.add_argument('--scale-factor', '--sf', type=float, default=1,
+                        help='data size to generate and load (see generate_dummy_data.py)')
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL', ''),
+                        help='PostgreSQL connection string (default: $DATABASE_URL)')
+    parser.add_argument('--queries', default=os.path.join(HERE, '03_benchmark_queries.sql'),
+                        help='SQL file of named queries')
+    parser.add_argument('--only', nargs='+', help='run only these query names')
+    parser.add_argument('--index-set', help='SQL file of CREATE INDEX statements to compare against')
+    parser.add_argument('--keep-indexes', action='store_true', help='do not drop the index set afterwards')
+    parser.add_argument('--runs', type=int, default=5, help='timed executions per query')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed executions per query first')
+    parser.add_argument('--skip-load', action='store_true', help='reuse the data already in the database')
+    parser.add_argument('--engine', choices=['python', 'numpy'], default='numpy')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--basket-size', type=float, default=1,
+                        help='mean line items per transaction, for the basket and per-order queries')
+    parser.add_argument('--start-date', default='2023-01-01')
+    parser.add_argument('--end-date', default='2024-02-28')
+    parser.add_argument('--output', help='where to save results as JSON (default: benchmarks/queries-<timestamp>.json)')
+    args = parser.parse_args()
+    if args.basket_size < 1:
+        parser.error('--basket-size must be at least 1')
+    if args.basket_size > 1 and args.engine != 'numpy':
+        parser.error('--basket-size above 1 requires --engine numpy')
+
+    # Only needed for this benchmark
+    import psycopg2
+
+    print("Retail Sales Data Mart - SQL Workload Benchmark")
+    print("="*50)
+
+    queries = load_queries(args.queries)
+    if args.only:
+        queries = {name: queries[name] for name in args.only}
+
+    if not args.skip_load:
+        generate_and_load(args)
+
+    conn = psycopg2.connect(args.dsn)
+    conn.autocommit = True
+    try:
+        results = run_query_set(conn, queries, args, 'base indexes')
+        if args.index_set:
+            created = apply_index_set(conn, load_statements(args.index_set))
+            try:
+                with_indexes = run_query_set(conn, queries, args, os.path.basename(args.index_set))
+            finally:
+                if not args.keep_indexes:
+                    drop_indexes(conn, created)
+            compare_index_sets(results, with_indexes)
+            results.extend(with_indexes)
+        with conn.cursor() as cur:
+            cur.execute('SHOW server_version')
+            server_version = cur.fetchone()[0]
+    finally:
+        conn.close()
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'scale_factor': args.scale_factor,
+        'seed': args.seed,
+        'basket_size': args.basket_size,
+        'loaded': not args.skip_load,
+        'date_range': [args.start_date, args.end_date],
+        'index_set': args.index_set,
+        'postgres': server_version,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results
+    }
+
+    output = args.output or f"benchmarks/queries-{datetime.now():%Y%m%d-%H%M%S}.json"
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📈 Results saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
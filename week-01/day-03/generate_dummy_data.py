@@ -4,30 +4,1521 @@ Data Generation Script for Retail Sales Star Schema
 Generates realistic dummy data for testing and development
 """
 
-import pandas as pd
-import numpy as np
-from faker import Faker
 import random
 from datetime import datetime, timedelta, date
+import argparse
+import contextlib
+import copy
 import csv
+import glob
+import hashlib
+import io
+import json
 import os
-from tqdm import tqdm
+import resource
+import shutil
+import sys
+import time
+import tracemalloc
+import threading
+import zlib
+
+
+# pandas and numpy take most of the startup time, so functions import them
+# where they are used: --help and --dry-run never load them, and the import
+# is only a sys.modules lookup after the first stage
+
+# Faker with Indonesian locale, built on first use since loading every
+# provider for both locales is slow
+_faker = None
+
+
+def _get_faker():
+    """The process-wide Faker instance"""
+    global _faker
+    if _faker is None:
+        from faker import Faker
+        _faker = Faker(['id_ID', 'en_US'])
+    return _faker
+
+
+# Part of every table's cache key; bump when the same config starts
+# producing different output, so cached tables are rebuilt
+GENERATOR_VERSION = '4'
+
+# Typical retail traffic shape: busier weekends, lunch and evening peaks
+RETAIL_WEEKDAY_WEIGHTS = [0.9, 0.85, 0.9, 0.95, 1.1, 1.4, 1.3]
+RETAIL_HOURLY_WEIGHTS = [
+    0.05, 0.02, 0.01, 0.01, 0.02, 0.05, 0.15, 0.35, 0.6, 0.85, 1.0, 1.2,
+    1.4, 1.2, 1.0, 1.0, 1.1, 1.3, 1.5, 1.6, 1.4, 1.0, 0.5, 0.2
+]
+
+# Table sizes at scale factor 1; every size scales linearly with the scale factor
+SCALE_FACTOR_1 = {
+    'num_products': 500,
+    'num_stores': 25,
+    'num_customers': 5000,
+    'num_transactions': 50000,
+}
+
+# The initial load spreads fact rows over batch_id 1..INITIAL_BATCHES;
+# incremental batches are numbered after them
+INITIAL_BATCHES = 10
+
+# Rough per-row output size and single-core throughput, measured at SF1,
+# used to estimate a run before it starts
+ESTIMATE_BYTES_PER_ROW = {
+    'csv': {'dim_time': 65, 'dim_time_hour': 48, 'dim_time_minute': 58, 'dim_product': 235, 'dim_store': 330, 'dim_customer': 340, 'fact_sales': 265, 'fact_order_header': 210},
+    'parquet': {'dim_time': 15, 'dim_time_hour': 5, 'dim_time_minute': 3, 'dim_product': 90, 'dim_store': 490, 'dim_customer': 90, 'fact_sales': 70, 'fact_order_header': 60},
+}
+ESTIMATE_ROWS_PER_SEC = {
+    'dim_time': 150000,
+    'dim_time_hour': 250000,
+    'dim_time_minute': 250000,
+    'dim_product': 3000,
+    'dim_store': 2000,
+    'dim_customer': 7000,
+    'fact_sales': {'python': 5000, 'numpy': 25000},
+    'fact_order_header': 60000,
+}
+
+# Typed star schema, in generated column order, for the direct database load
+TABLE_SCHEMAS = {
+    'dim_time': [
+        ('full_date', 'DATE'),
+        ('year', 'INTEGER'),
+        ('quarter', 'INTEGER'),
+        ('month', 'INTEGER'),
+        ('month_name', 'VARCHAR(20)'),
+        ('day_of_month', 'INTEGER'),
+        ('day_of_week', 'INTEGER'),
+        ('day_name', 'VARCHAR(20)'),
+        ('week_of_year', 'INTEGER'),
+        ('is_weekend', 'BOOLEAN'),
+        ('is_holiday', 'BOOLEAN'),
+        ('holiday_name', 'VARCHAR(50)'),
+    ],
+    'dim_product': [
+        ('product_id', 'INTEGER'),
+        ('product_sku', 'VARCHAR(50)'),
+        ('product_name', 'VARCHAR(255)'),
+        ('product_description', 'TEXT'),
+        ('category_id', 'INTEGER'),
+        ('category_name', 'VARCHAR(100)'),
+        ('subcategory_id', 'INTEGER'),
+        ('subcategory_name', 'VARCHAR(100)'),
+        ('brand', 'VARCHAR(100)'),
+        ('supplier_id', 'INTEGER'),
+        ('supplier_name', 'VARCHAR(255)'),
+        ('manufacturer', 'VARCHAR(255)'),
+        ('unit_cost', 'NUMERIC(12,2)'),
+        ('unit_price', 'NUMERIC(12,2)'),
+        ('reorder_level', 'INTEGER'),
+        ('target_stock_level', 'INTEGER'),
+        ('weight_kg', 'NUMERIC(8,3)'),
+        ('dimensions', 'VARCHAR(100)'),
+        ('is_active', 'BOOLEAN'),
+        ('is_discontinued', 'BOOLEAN'),
+        ('created_date', 'DATE'),
+        ('discontinued_date', 'DATE'),
+        ('last_restock_date', 'DATE'),
+    ],
+    'dim_store': [
+        ('store_id', 'INTEGER'),
+        ('store_code', 'VARCHAR(50)'),
+        ('store_name', 'VARCHAR(255)'),
+        ('store_type', 'VARCHAR(100)'),
+        ('store_format', 'VARCHAR(100)'),
+        ('region_id', 'INTEGER'),
+        ('region_name', 'VARCHAR(100)'),
+        ('subregion_id', 'INTEGER'),
+        ('subregion_name', 'VARCHAR(100)'),
+        ('city', 'VARCHAR(100)'),
+        ('state_province', 'VARCHAR(100)'),
+        ('address', 'TEXT'),
+        ('postal_code', 'VARCHAR(20)'),
+        ('country', 'VARCHAR(100)'),
+        ('latitude', 'NUMERIC(9,6)'),
+        ('longitude', 'NUMERIC(9,6)'),
+        ('manager_id', 'INTEGER'),
+        ('manager_name', 'VARCHAR(255)'),
+        ('employee_count', 'INTEGER'),
+        ('square_feet', 'INTEGER'),
+        ('number_of_floors', 'INTEGER'),
+        ('has_parking', 'BOOLEAN'),
+        ('has_cafe', 'BOOLEAN'),
+        ('opening_date', 'DATE'),
+        ('closing_date', 'DATE'),
+        ('renovation_date', 'DATE'),
+        ('monthly_rent', 'NUMERIC(12,2)'),
+        ('annual_sales_target', 'NUMERIC(14,2)'),
+        ('is_active', 'BOOLEAN'),
+        ('is_temporary_closed', 'BOOLEAN'),
+    ],
+    'dim_customer': [
+        ('customer_id', 'INTEGER'),
+        ('customer_code', 'VARCHAR(50)'),
+        ('first_name', 'VARCHAR(100)'),
+        ('last_name', 'VARCHAR(100)'),
+        ('email', 'VARCHAR(255)'),
+        ('phone', 'VARCHAR(50)'),
+        ('phone_secondary', 'VARCHAR(50)'),
+        ('birth_date', 'DATE'),
+        ('gender', 'VARCHAR(20)'),
+        ('marital_status', 'VARCHAR(20)'),
+        ('address', 'TEXT'),
+        ('city', 'VARCHAR(100)'),
+        ('state_province', 'VARCHAR(100)'),
+        ('postal_code', 'VARCHAR(20)'),
+        ('country', 'VARCHAR(100)'),
+        ('customer_segment', 'VARCHAR(50)'),
+        ('customer_tier', 'VARCHAR(50)'),
+        ('lifetime_value', 'NUMERIC(12,2)'),
+        ('registration_date', 'DATE'),
+        ('first_purchase_date', 'DATE'),
+        ('last_purchase_date', 'DATE'),
+        ('purchase_frequency', 'INTEGER'),
+        ('average_order_value', 'NUMERIC(12,2)'),
+        ('loyalty_points', 'INTEGER'),
+        ('loyalty_tier', 'VARCHAR(50)'),
+        ('referral_code', 'VARCHAR(50)'),
+        ('referred_by_id', 'INTEGER'),
+        ('email_opt_in', 'BOOLEAN'),
+        ('sms_opt_in', 'BOOLEAN'),
+        ('is_active', 'BOOLEAN'),
+        ('is_vip', 'BOOLEAN'),
+        ('is_employee', 'BOOLEAN'),
+    ],
+    'fact_sales': [
+        ('time_id', 'INTEGER'),
+        ('product_id', 'INTEGER'),
+        ('store_id', 'INTEGER'),
+        ('customer_id', 'INTEGER'),
+        ('transaction_id', 'VARCHAR(100)'),
+        ('sales_person_id', 'INTEGER'),
+        ('sales_person_name', 'VARCHAR(255)'),
+        ('quantity', 'INTEGER'),
+        ('unit_price', 'NUMERIC(12,2)'),
+        ('unit_cost', 'NUMERIC(12,2)'),
+        ('discount_type', 'VARCHAR(50)'),
+        ('discount_percentage', 'NUMERIC(5,2)'),
+        ('discount_amount', 'NUMERIC(12,2)'),
+        ('promotion_id', 'VARCHAR(50)'),
+        ('promotion_name', 'VARCHAR(100)'),
+        ('tax_rate', 'NUMERIC(5,2)'),
+        ('service_fee', 'NUMERIC(12,2)'),
+        ('shipping_fee', 'NUMERIC(12,2)'),
+        ('payment_method', 'VARCHAR(50)'),
+        ('payment_status', 'VARCHAR(50)'),
+        ('card_type', 'VARCHAR(50)'),
+        ('card_last_four', 'VARCHAR(10)'),
+        ('is_returned', 'BOOLEAN'),
+        ('return_reason', 'VARCHAR(100)'),
+        ('return_date', 'DATE'),
+        ('refund_amount', 'NUMERIC(12,2)'),
+        ('sales_channel', 'VARCHAR(50)'),
+        ('online_order_id', 'VARCHAR(100)'),
+        ('transaction_time', 'TIMESTAMP'),
+        ('source_system', 'VARCHAR(50)'),
+        ('batch_id', 'INTEGER'),
+        ('total_amount', 'NUMERIC'),
+        ('net_amount', 'NUMERIC'),
+        ('tax_amount', 'NUMERIC'),
+        ('gross_amount', 'NUMERIC'),
+    ],
+}
+
+# Optional rollups of fact_sales (DataGenerator.rollups): group keys per table,
+# plus a transaction count and the sum of each measure
+ROLLUP_KEYS = {
+    'agg_sales_daily_store': ['time_id', 'store_id'],
+    'agg_sales_daily_product': ['time_id', 'product_id'],
+    'agg_sales_monthly_category': ['month_start', 'category_name'],
+}
+ROLLUP_MEASURES = ['quantity', 'total_amount', 'discount_amount', 'net_amount', 'tax_amount', 'gross_amount']
+
+ROLLUP_KEY_TYPES = {
+    'time_id': 'INTEGER',
+    'store_id': 'INTEGER',
+    'product_id': 'INTEGER',
+    'month_start': 'DATE',
+    'category_name': 'VARCHAR(100)',
+}
+for _table, _keys in ROLLUP_KEYS.items():
+    TABLE_SCHEMAS[_table] = (
+        [(key, ROLLUP_KEY_TYPES[key]) for key in _keys]
+        + [('transaction_count', 'BIGINT'), ('quantity', 'BIGINT')]
+        + [(measure, 'NUMERIC') for measure in ROLLUP_MEASURES[1:]]
+    )
+
+# Optional finer time grains (DataGenerator.time_grain): table, key column and
+# rows per day. Keys count from time_origin like the day-grain time_id, so a
+# fact row's hour_id / minute_id follows from its transaction_time alone
+TIME_GRAINS = {
+    'hour': ('dim_time_hour', 'hour_id', 24),
+    'minute': ('dim_time_minute', 'minute_id', 1440),
+}
+TABLE_SCHEMAS['dim_time_hour'] = [
+    ('hour_id', 'INTEGER'),
+    ('time_id', 'INTEGER'),
+    ('full_date', 'DATE'),
+    ('hour', 'INTEGER'),
+    ('day_part', 'VARCHAR(20)'),
+    ('is_weekend', 'BOOLEAN'),
+    ('is_holiday', 'BOOLEAN'),
+]
+TABLE_SCHEMAS['dim_time_minute'] = [
+    ('minute_id', 'INTEGER'),
+    ('hour_id', 'INTEGER'),
+    ('time_id', 'INTEGER'),
+    ('full_date', 'DATE'),
+    ('hour', 'INTEGER'),
+    ('minute', 'INTEGER'),
+    ('day_part', 'VARCHAR(20)'),
+    ('is_weekend', 'BOOLEAN'),
+    ('is_holiday', 'BOOLEAN'),
+]
+
+# Multi-line baskets (DataGenerator.basket_size): fact columns drawn once per
+# transaction and repeated on each of its line items. The optional
+# fact_order_header table has one row per transaction with these columns,
+# its line count and the sum of each measure over its lines.
+ORDER_HEADER_COLUMNS = [
+    'transaction_id', 'time_id', 'store_id', 'customer_id', 'sales_person_id', 'sales_person_name',
+    'payment_method', 'payment_status', 'card_type', 'card_last_four', 'sales_channel',
+    'online_order_id', 'transaction_time', 'source_system', 'batch_id',
+]
+# service_fee and shipping_fee are charged once per transaction, on its first line
+ORDER_FEES = ['service_fee', 'shipping_fee']
+ORDER_MEASURES = ['quantity', 'total_amount', 'discount_amount', 'net_amount', 'tax_amount'] + ORDER_FEES + ['gross_amount']
+
+_fact_types = dict(TABLE_SCHEMAS['fact_sales'])
+TABLE_SCHEMAS['fact_order_header'] = (
+    [(column, _fact_types[column]) for column in ORDER_HEADER_COLUMNS]
+    + [('line_count', 'INTEGER')]
+    + [(measure, _fact_types[measure]) for measure in ORDER_MEASURES]
+)
+
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+               'August', 'September', 'October', 'November', 'December']
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+# Six-hour day parts, the first starting at midnight
+DAY_PARTS = ['Night', 'Morning', 'Afternoon', 'Evening']
+
+# Indonesian public holidays: fixed dates recur every year, Good Friday and
+# Ascension Day follow Easter, and lunar-calendar holidays are listed per year
+INDONESIA_FIXED_HOLIDAYS = {
+    '01-01': "New Year's Day",
+    '05-01': 'Labour Day',
+    '06-01': 'Pancasila Day',
+    '08-17': 'Independence Day',
+    '12-25': 'Christmas Day',
+}
+INDONESIA_EASTER_HOLIDAYS = {
+    -2: 'Good Friday',
+    39: 'Ascension Day',
+}
+INDONESIA_DATED_HOLIDAYS = {
+    '2023-03-22': 'Nyepi',
+    '2023-04-22': 'Eid al-Fitr',
+    '2023-06-29': 'Eid al-Adha',
+    '2023-07-19': 'Islamic New Year',
+    '2023-09-28': "Prophet's Birthday",
+    '2024-03-11': 'Nyepi',
+    '2024-04-10': 'Eid al-Fitr',
+    '2024-05-23': 'Vesak',
+    '2024-06-17': 'Eid al-Adha',
+    '2024-07-07': 'Islamic New Year',
+    '2024-09-16': "Prophet's Birthday",
+}
+
+# Rules checked by IntegrityValidator, in report order
+INTEGRITY_RULES = {
+    'product_fk': 'product_id not in dim_product',
+    'store_fk': 'store_id not in dim_store',
+    'customer_fk': 'customer_id set but not in dim_customer',
+    'referred_by_fk': 'referred_by_id set but not in dim_customer',
+    'self_referral': 'customer referred by itself',
+    'total_amount': 'total_amount != quantity * unit_price',
+    'net_amount': 'net_amount != total_amount - discount_amount',
+    'tax_amount': 'tax_amount != net_amount * tax_rate / 100',
+    'gross_amount': 'gross_amount != net + tax + service_fee + shipping_fee',
+    'discount_amount': 'discount_amount outside [0, total_amount]',
+    'refund_amount': 'refund_amount outside [0, total_amount]',
+    'time_id': 'time_id does not match transaction_time',
+    'time_keys': 'hour_id / minute_id do not match transaction_time',
+    'transaction_time': 'transaction_time outside the generated date range',
+    'return_date': 'return_date not after the transaction date',
+    'return_flags': 'is_returned disagrees with return_date, refund_amount or return_reason',
+    'discontinued_product': 'sold after the product was discontinued',
+    'closed_store': 'sold before the store opened or after it closed',
+}
+# Rules checked on the dimension tables rather than on fact rows
+DIMENSION_RULES = ('referred_by_fk', 'self_referral')
+# Amounts are rounded to cents, so sums are compared to within half a cent
+INTEGRITY_TOLERANCE = 0.005
+
+# Arrow types for the Parquet output, keyed by the SQL type name
+ARROW_TYPES = {
+    'INTEGER': 'int32',
+    'BIGINT': 'int64',
+    'BOOLEAN': 'bool',
+    'DATE': 'date32',
+    'TIMESTAMP': 'timestamp[s]',
+    'NUMERIC': 'float64',
+    'VARCHAR': 'string',
+    'TEXT': 'string',
+}
+
+# Keys and indexes are built after the bulk load, not before it
+TABLE_INDEXES = [
+    'ALTER TABLE dim_time ADD PRIMARY KEY (full_date)',
+    'ALTER TABLE dim_product ADD PRIMARY KEY (product_id)',
+    'ALTER TABLE dim_store ADD PRIMARY KEY (store_id)',
+    'ALTER TABLE dim_customer ADD PRIMARY KEY (customer_id)',
+    'CREATE INDEX idx_fact_sales_time ON fact_sales(time_id)',
+    'CREATE INDEX idx_fact_sales_product ON fact_sales(product_id)',
+    'CREATE INDEX idx_fact_sales_store ON fact_sales(store_id)',
+    'CREATE INDEX idx_fact_sales_customer ON fact_sales(customer_id)',
+]
+
+# Added after the keys above exist (time_id is a day offset, not a dim_time key;
+# hour_id and minute_id get theirs when their TIME_GRAINS table is loaded)
+TABLE_FOREIGN_KEYS = [
+    'ALTER TABLE fact_sales ADD FOREIGN KEY (product_id) REFERENCES dim_product (product_id)',
+    'ALTER TABLE fact_sales ADD FOREIGN KEY (store_id) REFERENCES dim_store (store_id)',
+    'ALTER TABLE fact_sales ADD FOREIGN KEY (customer_id) REFERENCES dim_customer (customer_id)',
+]
+
+
+def _categorical(rng, categories, n, mask=None, p=None):
+    """Draw n values as a Categorical (integer codes + dictionary)
+    
+    Rows where mask is False are missing; p gives per-category weights.
+    """
+    import numpy as np
+    import pandas as pd
+    
+    if p is None:
+        codes = rng.integers(0, len(categories), n, dtype=np.int16)
+    else:
+        codes = rng.choice(len(categories), n, p=p).astype(np.int16)
+    if mask is not None:
+        codes[~mask] = -1
+    return pd.Categorical.from_codes(codes, categories)
+
+
+def _stable_id(text, modulo):
+    """Deterministic small id for a name (hash() changes with PYTHONHASHSEED)"""
+    return zlib.crc32(text.encode()) % modulo
+
+
+def _years_before(day, years):
+    """The same calendar day years earlier; Feb 29 falls back to Feb 28 in non-leap years"""
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        return day.replace(year=day.year - years, day=28)
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _masked(mask, values):
+    """Keep values where mask is set, None elsewhere"""
+    import numpy as np
+    
+    return np.where(mask, values, None)
+
+
+def _day_numbers(values):
+    """datetime64[D] days of date or timestamp values (datetime64 or ISO strings; NaT when missing)"""
+    import pandas as pd
+    
+    return pd.to_datetime(pd.Series(values)).to_numpy().astype('datetime64[D]')
+
+
+def _key_positions(ids):
+    """Dense array mapping each integer key to its row position, -1 for non-keys"""
+    import numpy as np
+    
+    ids = np.asarray(ids, dtype=np.int64)
+    positions = np.full(ids.max(initial=0) + 1, -1, dtype=np.int64)
+    positions[ids] = np.arange(len(ids))
+    return positions
+
+
+def _lookup_positions(positions, ids):
+    """Row positions of ids (NaN for none) in a _key_positions array, -1 when not a key"""
+    import numpy as np
+    
+    ids = np.asarray(ids, dtype=float)
+    known = (ids >= 0) & (ids < len(positions))
+    return np.where(known, positions[np.where(known, ids, 0).astype(np.int64)], -1)
+
+
+def _records(table):
+    """Rows of a dimension table as a list of dicts"""
+    import pandas as pd
+    
+    return table.to_dict('records') if isinstance(table, pd.DataFrame) else table
+
+
+# Per-process state for fact shard workers, filled once by the pool initializer
+_worker_state = {}
+
+
+def _init_fact_worker(generator, dims):
+    """Receive the generator config and dimension arrays once per worker"""
+    _worker_state['generator'] = generator
+    _worker_state['dims'] = dims
+
+
+def _generate_fact_shard(task):
+    """Worker entry point: generate and write one fact_sales shard"""
+    return _worker_state['generator']._write_fact_shard(*task, _worker_state['dims'])
+
+
+def _arrow_table(table, df):
+    """Convert a generated DataFrame to an Arrow table with the typed schema"""
+    import pandas as pd
+    
+    import pyarrow as pa
+    
+    types = dict(TABLE_SCHEMAS[table])
+    arrays = {}
+    for column in df.columns:
+        values = df[column]
+        arrow_type = ARROW_TYPES[types[column].split('(')[0]] if column in types else None
+        if arrow_type in ('date32', 'timestamp[s]'):
+            # Dates are generated as ISO strings; NaN/None become nulls
+            values = pd.to_datetime(values)
+        array = pa.Array.from_pandas(values)
+        arrays[column] = array.cast(arrow_type) if arrow_type else array
+    return pa.table(arrays)
+
+
+def _path_size(path):
+    """Bytes of a file, or of all files under a directory (0 when missing)"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process so far (every stage up to now), in MB"""
+    # ru_maxrss is KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class Progress:
+    """Rate-limited progress line on stderr, replacing per-iteration bars
+    
+    update() only adds to a counter and reads the clock; the line is
+    redrawn at most once per interval. Callers update once per chunk.
+    """
+    
+    def __init__(self, total, desc, enabled=True, interval=1.0, callback=None):
+        self.total = total
+        self.desc = desc
+        self.enabled = enabled
+        self.interval = interval
+        self.callback = callback
+        self.done = 0
+        self.start = self.last = time.perf_counter()
+    
+    def update(self, n=1):
+        self.done += n
+        now = time.perf_counter()
+        if now - self.last >= self.interval:
+            self.last = now
+            self._emit(now, '\r')
+    
+    def close(self):
+        self._emit(time.perf_counter(), '\n')
+    
+    def _emit(self, now, end):
+        elapsed = now - self.start
+        rate = self.done / elapsed if elapsed else 0.0
+        if self.enabled:
+            percent = f' ({self.done / self.total:.0%})' if self.total else ''
+            print(f"  {self.desc}: {self.done:,}/{self.total:,}{percent} {rate:,.0f}/s", end=end, file=sys.stderr, flush=True)
+        if self.callback:
+            self.callback({'event': 'progress', 'desc': self.desc, 'done': self.done, 'total': self.total, 'rate': rate})
+
+
+class Instrumentation:
+    """Per-stage wall time, rows/sec, bytes written and peak memory
+    
+    profile turns on cProfile ('cprofile': .prof file and top functions per
+    stage) or tracemalloc ('tracemalloc': peak Python allocations per
+    stage). Finished stages are kept in stages and passed to callback.
+    Writers report their bytes with add_bytes() while a stage is open.
+    """
+    
+    def __init__(self, profile=None, callback=None, output_dir='data'):
+        if profile not in (None, 'cprofile', 'tracemalloc'):
+            raise ValueError(f"profile must be None, 'cprofile' or 'tracemalloc', not '{profile}'")
+        self.profile = profile
+        self.callback = callback
+        self.output_dir = output_dir
+        self.stages = []
+        self.active = []
+    
+    def add_bytes(self, num_bytes):
+        """Count bytes written to the output towards every open stage"""
+        for record in self.active:
+            record['bytes_written'] += num_bytes
+    
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time the enclosed block; set record['rows'] inside it for rows/sec"""
+        record = {'stage': name, 'rows': None, 'bytes_written': 0}
+        self.active.append(record)
+        profiler = None
+        if self.profile == 'cprofile':
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        elif self.profile == 'tracemalloc':
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            seconds = time.perf_counter() - start
+            if profiler:
+                profiler.disable()
+            self.active.remove(record)
+            
+            rows = record['rows']
+            record.update({
+                'seconds': round(seconds, 4),
+                'rows_per_sec': round(rows / seconds, 1) if rows and seconds else None,
+                # ru_maxrss is a process-wide high-water mark, not this stage's own peak
+                'cumulative_peak_rss_mb': round(_peak_rss_mb(), 1),
+            })
+            if self.profile == 'tracemalloc':
+                record['tracemalloc_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1e6, 1)
+            if profiler:
+                record.update(self._profile_summary(name, profiler))
+            
+            self.stages.append(record)
+            if self.callback:
+                self.callback(dict(record, event='stage'))
+    
+    def _profile_summary(self, name, profiler):
+        """Save the stage's profile and list its most expensive functions"""
+        profile_dir = os.path.join(self.output_dir, 'profiles')
+        os.makedirs(profile_dir, exist_ok=True)
+        path = os.path.join(profile_dir, f'{name}.prof')
+        profiler.dump_stats(path)
+        
+        import pstats
+        stats = pstats.Stats(profiler)
+        top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:10]
+        return {
+            'profile': path,
+            'top_functions': [
+                {'function': f'{filename}:{line}({function})', 'calls': calls, 'cumulative_seconds': round(cumulative, 4)}
+                for (filename, line, function), (_, calls, _, cumulative, _) in top
+            ],
+        }
+    
+    def print_summary(self):
+        print(f"\n⏱️  Stage Timings:")
+        for record in self.stages:
+            rate = f"{record['rows_per_sec']:>12,.0f} rows/sec" if record['rows_per_sec'] else ' ' * 21
+            print(f"  • {record['stage']:<20} {record['seconds']:8.2f}s {rate}  "
+                  f"{record['bytes_written'] / 1e6:9.1f} MB  peak RSS so far {record['cumulative_peak_rss_mb']:,.0f} MB")
+    
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump({
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'profile': self.profile,
+                'stages': self.stages
+            }, f, indent=2)
+
+
+def _easter_sundays(years):
+    """Gregorian Easter Sunday of each year (anonymous Gregorian algorithm)"""
+    import numpy as np
+    
+    years = np.asarray(years, dtype=np.int64)
+    a = years % 19
+    b, c = np.divmod(years, 100)
+    d, e = np.divmod(b, 4)
+    g = (b - (b + 8) // 25 + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = np.divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = np.divmod(h + l - 7 * m + 114, 31)
+    return _ymd_days(years, month, day + 1)
+
+
+def _ymd_days(years, months, days):
+    """datetime64[D] array from year, month and day arrays"""
+    import numpy as np
+    
+    first_of_month = (np.asarray(years) - 1970) * 12 + np.asarray(months) - 1
+    return first_of_month.astype('datetime64[M]').astype('datetime64[D]') + (np.asarray(days) - 1)
+
+
+class HolidayCalendar:
+    """Public holidays, looked up for whole arrays of days at once
+    
+    fixed maps 'MM-DD' to a name for holidays on the same date every year,
+    easter maps a day offset from Easter Sunday to a name, and dated maps
+    'YYYY-MM-DD' to a name for everything else; on a shared day, dated wins
+    over easter and easter over fixed. The holidays of a year range are
+    built once into a sorted day index and searched with np.searchsorted.
+    """
+    
+    def __init__(self, fixed=None, easter=None, dated=None):
+        self.fixed = dict(fixed or {})
+        self.easter = dict(easter or {})
+        self.dated = dict(dated or {})
+        self._index = {}
+    
+    @classmethod
+    def indonesia(cls):
+        """The default calendar; lunar holidays are listed for 2023-2024 only"""
+        return cls(INDONESIA_FIXED_HOLIDAYS, INDONESIA_EASTER_HOLIDAYS, INDONESIA_DATED_HOLIDAYS)
+    
+    def with_csv(self, path):
+        """A copy with the holidays of a CSV file (date, name columns) added"""
+        with open(path, newline='') as f:
+            dated = {row['date']: row['name'] for row in csv.DictReader(f)}
+        return HolidayCalendar(self.fixed, self.easter, {**self.dated, **dated})
+    
+    def fingerprint(self):
+        """Stable description of the rules, for cache keys"""
+        return [sorted(self.fixed.items()), sorted(self.easter.items()), sorted(self.dated.items())]
+    
+    def holidays(self, first_year, last_year):
+        """Sorted holiday days and their names for the years first_year..last_year"""
+        import numpy as np
+        
+        if (first_year, last_year) not in self._index:
+            years = np.arange(first_year, last_year + 1)
+            days, names = [], []
+            for month_day, name in self.fixed.items():
+                month, day = (int(part) for part in month_day.split('-'))
+                days.append(_ymd_days(years, month, day))
+                names.append(np.full(len(years), name, dtype=object))
+            easter = _easter_sundays(years)
+            for offset, name in self.easter.items():
+                days.append(easter + offset)
+                names.append(np.full(len(years), name, dtype=object))
+            days.append(np.array(list(self.dated), dtype='datetime64[D]'))
+            names.append(np.array(list(self.dated.values()), dtype=object))
+            
+            days = np.concatenate(days)
+            names = np.concatenate(names)
+            # Last rule wins on a shared day: keep the last occurrence of each day
+            days, last = np.unique(days[::-1], return_index=True)
+            names = names[::-1][last]
+            in_range = (days >= np.datetime64(f'{first_year:04d}-01-01')) & (days <= np.datetime64(f'{last_year:04d}-12-31'))
+            self._index[(first_year, last_year)] = (days[in_range], names[in_range])
+        return self._index[(first_year, last_year)]
+    
+    def lookup(self, days):
+        """is_holiday flags and holiday names (None elsewhere) for datetime64[D] days"""
+        import numpy as np
+        
+        days = np.asarray(days, dtype='datetime64[D]')
+        if not len(days):
+            return np.zeros(0, dtype=bool), np.empty(0, dtype=object)
+        years = days.astype('datetime64[Y]').astype(int) + 1970
+        holiday_days, holiday_names = self.holidays(int(years.min()), int(years.max()))
+        if not len(holiday_days):
+            return np.zeros(len(days), dtype=bool), np.full(len(days), None, dtype=object)
+        position = np.minimum(np.searchsorted(holiday_days, days), len(holiday_days) - 1)
+        is_holiday = holiday_days[position] == days
+        return is_holiday, np.where(is_holiday, holiday_names[position], None)
+
+
+class AliasSampler:
+    """Draw indices in proportion to fixed weights in O(1) per draw (Vose's alias method)"""
+    
+    def __init__(self, weights):
+        import numpy as np
+        
+        weights = np.asarray(weights, dtype=float)
+        n = len(weights)
+        scaled = weights * n / weights.sum()
+        prob = np.ones(n)
+        alias = np.arange(n)
+        
+        # Pair each under-full slot with an over-full one; built once per table
+        small = [k for k in range(n) if scaled[k] < 1.0]
+        large = [k for k in range(n) if scaled[k] >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] += scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        
+        self.prob = prob
+        self.alias = alias
+    
+    def __len__(self):
+        return len(self.prob)
+    
+    def sample(self, rng, n):
+        """Draw n indices with a NumPy Generator"""
+        import numpy as np
+        
+        slots = rng.integers(0, len(self.prob), n)
+        return np.where(rng.random(n) < self.prob[slots], slots, self.alias[slots])
+    
+    def draw(self):
+        """Draw one index with the random module (python engine)"""
+        slot = random.randrange(len(self.prob))
+        return slot if random.random() < self.prob[slot] else int(self.alias[slot])
+
+
+def _hash64(values):
+    """splitmix64 finalizer: well-mixed, PYTHONHASHSEED-independent 64-bit hashes of integers"""
+    import numpy as np
+    
+    h = np.asarray(values).astype(np.uint64)
+    with np.errstate(over='ignore'):
+        h = h + np.uint64(0x9E3779B97F4A7C15)
+        h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+class HyperLogLog:
+    """Approximate distinct count in 2**precision one-byte registers (~1% error at 14)"""
+    
+    def __init__(self, precision=14):
+        import numpy as np
+        
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+    
+    def add(self, values):
+        """Add an array of integer values"""
+        import numpy as np
+        
+        h = _hash64(values)
+        p = self.precision
+        slots = (h >> np.uint64(64 - p)).astype(np.intp)
+        # Rank = position of the first set bit in the remaining 64 - p bits; the
+        # remainder fits a float mantissa exactly, so frexp gives its bit length
+        rest = (h & np.uint64((1 << (64 - p)) - 1)).astype(float)
+        ranks = (64 - p + 1 - np.frexp(rest)[1]).astype(np.uint8)
+        np.maximum.at(self.registers, slots, ranks)
+    
+    def merge(self, other):
+        """Fold another sketch of the same precision into this one"""
+        import numpy as np
+        
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+    
+    def count(self):
+        """Estimated number of distinct values added"""
+        import numpy as np
+        
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(int)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # Small-range correction: linear counting while registers are still empty
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+def _category_lookup(product_ids, product_categories):
+    """Distinct categories and a product_id -> category code array, so chunks need no join"""
+    import numpy as np
+    
+    categories, codes = np.unique(np.asarray(product_categories, dtype=object), return_inverse=True)
+    product_ids = np.asarray(product_ids, dtype=np.intp)
+    category_of_product = np.full(product_ids.max(initial=0) + 1, -1, dtype=np.int16)
+    category_of_product[product_ids] = codes
+    return list(categories), category_of_product
+
+
+def _transaction_numbers(df):
+    """Position of each row's transaction within a fact chunk, or None when every row is its own transaction
+    
+    Chunks hold whole transactions with their lines in order, so the
+    transactions of a chunk are counted exactly by counting within it.
+    """
+    import numpy as np
+    
+    if 'line_number' not in df:
+        return None
+    return np.cumsum(df['line_number'].to_numpy() == 1)
+
+
+def _transaction_bincount(transaction, index):
+    """np.bincount(index), counting each transaction once per key however many of its lines share it"""
+    import numpy as np
+    
+    if transaction is None:
+        return np.bincount(index)
+    _, first = np.unique(transaction * (int(index.max(initial=0)) + 1) + index, return_index=True)
+    return np.bincount(index[first], minlength=int(index.max(initial=-1)) + 1)
+
+
+class SalesStatistics:
+    """Summary statistics of fact_sales accumulated chunk by chunk
+    
+    Totals, per-category/store/channel counts and revenue, and a
+    HyperLogLog sketch of distinct customers. Accumulators from separate
+    shards combine with merge(), so no pass over the full table is needed.
+    """
+    
+    def __init__(self, product_ids, product_categories, channels):
+        import numpy as np
+        
+        self.categories, self.category_of_product = _category_lookup(product_ids, product_categories)
+        self.channels = list(channels)
+        
+        self.transactions = 0
+        self.total_revenue = 0.0
+        self.total_discount = 0.0
+        self.breakdowns = {
+            'category': (np.zeros(len(self.categories), dtype=np.int64), np.zeros(len(self.categories))),
+            'store': (np.zeros(0, dtype=np.int64), np.zeros(0)),
+            'channel': (np.zeros(len(self.channels), dtype=np.int64), np.zeros(len(self.channels))),
+        }
+        self.customers = HyperLogLog()
+    
+    def update(self, df):
+        """Add one chunk of fact rows (derived columns already calculated)"""
+        import numpy as np
+        import pandas as pd
+        
+        revenue = df['total_amount'].to_numpy(float)
+        # Lines of a multi-line basket share one transaction
+        self.transactions += int((df['line_number'] == 1).sum()) if 'line_number' in df else len(df)
+        self.total_revenue += revenue.sum()
+        self.total_discount += df['discount_amount'].to_numpy(float).sum()
+        
+        channel = pd.Categorical(df['sales_channel'], categories=self.channels).codes
+        keys = {
+            'category': self.category_of_product[df['product_id'].to_numpy(np.intp)],
+            'store': df['store_id'].to_numpy(np.intp),
+            'channel': channel,
+        }
+        transaction = _transaction_numbers(df)
+        for name, index in keys.items():
+            valid = index >= 0
+            counts = _transaction_bincount(None if transaction is None else transaction[valid], index[valid].astype(np.int64))
+            sums = np.bincount(index[valid], weights=revenue[valid])
+            self._add_breakdown(name, counts, sums)
+        
+        customer_id = df['customer_id'].to_numpy(float)
+        self.customers.add(customer_id[~np.isnan(customer_id)].astype(np.int64))
+        return self
+    
+    def merge(self, other):
+        """Fold another accumulator (e.g. from a shard) into this one"""
+        self.transactions += other.transactions
+        self.total_revenue += other.total_revenue
+        self.total_discount += other.total_discount
+        for name, (counts, sums) in other.breakdowns.items():
+            self._add_breakdown(name, counts, sums)
+        self.customers.merge(other.customers)
+        return self
+    
+    def _add_breakdown(self, name, counts, sums):
+        """Add bincount-style arrays, growing the stored ones if needed"""
+        import numpy as np
+        
+        stored_counts, stored_sums = self.breakdowns[name]
+        size = max(len(stored_counts), len(counts))
+        stored_counts = np.pad(stored_counts, (0, size - len(stored_counts)))
+        stored_sums = np.pad(stored_sums, (0, size - len(stored_sums)))
+        stored_counts[:len(counts)] += counts.astype(np.int64)
+        stored_sums[:len(sums)] += sums
+        self.breakdowns[name] = (stored_counts, stored_sums)
+    
+    def breakdown(self, name):
+        """DataFrame of transactions and revenue per key for one breakdown"""
+        import numpy as np
+        import pandas as pd
+        
+        counts, sums = self.breakdowns[name]
+        if name == 'category':
+            keys = self.categories
+        elif name == 'channel':
+            keys = self.channels
+        else:
+            keys = np.arange(len(counts))
+        df = pd.DataFrame({'key': keys, 'transactions': counts, 'revenue': sums})
+        return df[df['transactions'] > 0].sort_values('revenue', ascending=False, ignore_index=True)
+
+
+class SalesRollups:
+    """The ROLLUP_KEYS tables of fact_sales, aggregated chunk by chunk
+    
+    Each chunk is grouped on its own and the partial sums are folded
+    together, which equals one GROUP BY over the whole table. Rollups
+    from separate shards or batches combine with merge().
+    """
+    
+    def __init__(self, product_ids, product_categories, time_origin):
+        import numpy as np
+        
+        self.categories, self.category_of_product = _category_lookup(product_ids, product_categories)
+        self.time_origin = np.datetime64(time_origin.date(), 'D')
+        self.columns = ['transaction_count'] + ROLLUP_MEASURES
+        self.parts = {table: [] for table in ROLLUP_KEYS}
+    
+    def update(self, df):
+        """Add one chunk of fact rows (derived columns already calculated)"""
+        import numpy as np
+        import pandas as pd
+        
+        days = self.time_origin + (df['time_id'].to_numpy() - 1).astype('timedelta64[D]')
+        frame = pd.DataFrame({
+            'time_id': df['time_id'].to_numpy(),
+            'store_id': df['store_id'].to_numpy(),
+            'product_id': df['product_id'].to_numpy(),
+            'month_start': days.astype('datetime64[M]').astype('datetime64[s]'),
+            'category_name': pd.Categorical.from_codes(
+                self.category_of_product[df['product_id'].to_numpy(np.intp)],
+                self.categories
+            ),
+            'transaction_count': np.ones(len(df), dtype=np.int64),
+        })
+        for measure in ROLLUP_MEASURES:
+            frame[measure] = df[measure].to_numpy()
+        
+        transaction = _transaction_numbers(df)
+        for table, keys in ROLLUP_KEYS.items():
+            if transaction is not None:
+                # A basket counts once per group, however many of its lines fall in it
+                frame['transaction_count'] = (~frame[keys].assign(transaction=transaction).duplicated()).astype(np.int64)
+            self._add_part(table, frame.groupby(keys, observed=True, sort=False)[self.columns].sum())
+        return self
+    
+    def add_table(self, table, df):
+        """Fold in a previously written rollup table (e.g. before appending a batch)"""
+        import pandas as pd
+        
+        df = df.copy()
+        if 'month_start' in df:
+            df['month_start'] = pd.to_datetime(df['month_start']).astype('datetime64[s]')
+        if 'category_name' in df:
+            df['category_name'] = pd.Categorical(df['category_name'], categories=self.categories)
+        self._add_part(table, df.set_index(ROLLUP_KEYS[table])[self.columns])
+        return self
+    
+    def merge(self, other):
+        """Fold another accumulator (e.g. from a shard) into this one"""
+        for table, parts in other.parts.items():
+            for part in parts:
+                self._add_part(table, part)
+        return self
+    
+    def _add_part(self, table, part):
+        """Keep a partial aggregate, re-grouping once enough have piled up"""
+        parts = self.parts[table]
+        parts.append(part)
+        if len(parts) >= 8:
+            self.parts[table] = [self._combine(parts)]
+    
+    def _combine(self, parts):
+        import pandas as pd
+        
+        return pd.concat(parts).groupby(level=list(range(parts[0].index.nlevels)), observed=True).sum()
+    
+    def table(self, table):
+        """Final rollup table, sorted by its keys"""
+        import pandas as pd
+        
+        parts = self.parts[table]
+        if not parts:
+            return pd.DataFrame(columns=[name for name, _ in TABLE_SCHEMAS[table]])
+        df = self._combine(parts).reset_index()
+        if 'month_start' in df:
+            df['month_start'] = df['month_start'].dt.strftime('%Y-%m-%d')
+        if 'category_name' in df:
+            df['category_name'] = df['category_name'].astype(str)
+        return df.sort_values(ROLLUP_KEYS[table], ignore_index=True)
+
+
+class IntegrityValidator:
+    """Integrity checks of fact_sales chunks against the dimension tables
+    
+    Dimension keys go into dense id -> position arrays once, so each rule in
+    INTEGRITY_RULES is a few array operations per chunk. Violation counts
+    accumulate across chunks; validators of separate shards combine with
+    merge(). Rows outside [first_day, last_day] break 'transaction_time'.
+    """
+    
+    def __init__(self, dim_products, dim_stores, dim_customers, time_origin, last_day):
+        import numpy as np
+        
+        self.time_origin = np.datetime64(time_origin.date(), 'D')
+        self.last_day = np.datetime64(last_day.date(), 'D')
+        self.product_positions = _key_positions(dim_products['product_id'])
+        self.store_positions = _key_positions(dim_stores['store_id'])
+        self.customer_positions = _key_positions(dim_customers['customer_id'])
+        self.discontinued_day = _day_numbers(dim_products['discontinued_date'])
+        self.opening_day = _day_numbers(dim_stores['opening_date'])
+        self.closing_day = _day_numbers(dim_stores['closing_date'])
+        
+        self.rows = 0
+        self.seconds = 0.0
+        self.violations = {rule: 0 for rule in INTEGRITY_RULES}
+        self.examples = {}
+        
+        # Referrals are checked once, on the customer rows themselves
+        customer_ids = dim_customers['customer_id'].to_numpy(float)
+        referred_by = dim_customers['referred_by_id'].to_numpy(float)
+        has_referrer = ~np.isnan(referred_by)
+        self._count('referred_by_fk', has_referrer & (_lookup_positions(self.customer_positions, referred_by) < 0), customer_ids)
+        self._count('self_referral', has_referrer & (referred_by == customer_ids), customer_ids)
+    
+    def _count(self, rule, mask, labels):
+        """Add the rows of mask to rule, keeping the label of its first offending row"""
+        import numpy as np
+        
+        count = int(np.count_nonzero(mask))
+        if count:
+            self.violations[rule] += count
+            if rule not in self.examples:
+                label = labels[np.argmax(mask)]
+                self.examples[rule] = str(int(label)) if isinstance(label, float) else str(label)
+    
+    def update(self, df):
+        """Check one chunk of fact rows (derived columns already calculated)"""
+        import numpy as np
+        import pandas as pd
+        
+        start = time.perf_counter()
+        labels = df['transaction_id'].to_numpy()
+        transaction_time = pd.to_datetime(df['transaction_time']).to_numpy().astype('datetime64[s]')
+        days = transaction_time.astype('datetime64[D]')
+        
+        # Foreign keys
+        product = _lookup_positions(self.product_positions, df['product_id'].to_numpy(float))
+        store = _lookup_positions(self.store_positions, df['store_id'].to_numpy(float))
+        customer_id = df['customer_id'].to_numpy(float)
+        self._count('product_fk', product < 0, labels)
+        self._count('store_fk', store < 0, labels)
+        self._count('customer_fk', ~np.isnan(customer_id) & (_lookup_positions(self.customer_positions, customer_id) < 0), labels)
+        
+        # Derived amounts
+        amounts = {
+            column: df[column].to_numpy(float)
+            for column in ['quantity', 'unit_price', 'discount_amount', 'tax_rate', 'service_fee', 'shipping_fee',
+                           'total_amount', 'net_amount', 'tax_amount', 'gross_amount', 'refund_amount']
+        }
+        total = amounts['total_amount']
+        
+        def differs(values, expected):
+            return ~np.isclose(values, expected, rtol=0, atol=INTEGRITY_TOLERANCE)
+        
+        self._count('total_amount', differs(total, amounts['quantity'] * amounts['unit_price']), labels)
+        self._count('net_amount', differs(amounts['net_amount'], total - amounts['discount_amount']), labels)
+        self._count('tax_amount', differs(amounts['tax_amount'], amounts['net_amount'] * amounts['tax_rate'] / 100), labels)
+        self._count('gross_amount', differs(
+            amounts['gross_amount'],
+            amounts['net_amount'] + amounts['tax_amount'] + amounts['service_fee'] + amounts['shipping_fee']
+        ), labels)
+        self._count('discount_amount', (amounts['discount_amount'] < -INTEGRITY_TOLERANCE)
+                    | (amounts['discount_amount'] > total + INTEGRITY_TOLERANCE), labels)
+        refund = amounts['refund_amount']
+        has_refund = ~np.isnan(refund)
+        self._count('refund_amount', has_refund & ((refund < -INTEGRITY_TOLERANCE) | (refund > total + INTEGRITY_TOLERANCE)), labels)
+        
+        # Time keys and dates
+        self._count('time_id', df['time_id'].to_numpy() != (days - self.time_origin).astype(np.int64) + 1, labels)
+        seconds = (transaction_time - self.time_origin.astype('datetime64[s]')).astype(np.int64)
+        for _, key, per_day in TIME_GRAINS.values():
+            if key in df:
+                self._count('time_keys', df[key].to_numpy() != seconds // (86400 // per_day) + 1, labels)
+        self._count('transaction_time', np.isnat(days) | (days < self.time_origin) | (days > self.last_day), labels)
+        return_day = _day_numbers(df['return_date'])
+        has_return_date = ~np.isnat(return_day)
+        self._count('return_date', has_return_date & (return_day <= days), labels)
+        
+        # Flags and the fields that depend on them
+        is_returned = df['is_returned'].to_numpy(bool)
+        has_reason = df['return_reason'].notna().to_numpy()
+        self._count('return_flags', (has_return_date != is_returned) | (has_refund != is_returned) | (has_reason != is_returned), labels)
+        
+        # Sales only while the product is sold and the store is open
+        known_product = product >= 0
+        self._count('discontinued_product', known_product & (days > self.discontinued_day[np.where(known_product, product, 0)]), labels)
+        known_store = store >= 0
+        store = np.where(known_store, store, 0)
+        self._count('closed_store', known_store & ((days < self.opening_day[store]) | (days > self.closing_day[store])), labels)
+        
+        self.rows += len(df)
+        self.seconds += time.perf_counter() - start
+    
+    def merge(self, other):
+        """Fold in the counts of another validator over the same dimensions"""
+        self.rows += other.rows
+        self.seconds += other.seconds
+        # Both validators already counted the shared customer referrals
+        for rule, count in other.violations.items():
+            if rule not in DIMENSION_RULES:
+                self.violations[rule] += count
+        for rule, example in other.examples.items():
+            self.examples.setdefault(rule, example)
+    
+    def report(self):
+        """Rows checked, check throughput and the count and first example per rule"""
+        return {
+            'rows': self.rows,
+            'seconds': round(self.seconds, 4),
+            'rows_per_sec': round(self.rows / self.seconds, 1) if self.seconds else None,
+            'violations': {
+                rule: {'rows': count, 'description': INTEGRITY_RULES[rule], 'example': self.examples.get(rule)}
+                for rule, count in self.violations.items()
+            },
+        }
+
+
+class PostgresLoader:
+    """Stream generated DataFrames into PostgreSQL with COPY ... FROM STDIN
+    
+    With num_connections > 1 each of that many load workers is a thread
+    with its own queue and its own pooled connection, so tables (and
+    partitions of fact_sales, each always on the same worker) load
+    concurrently while generation carries on.
+    """
+    
+    def __init__(self, dsn='', num_connections=1):
+        # Only needed for the database output mode
+        from psycopg2.pool import ThreadedConnectionPool
+        
+        # One connection for DDL plus one per load worker
+        self.pool = ThreadedConnectionPool(1, num_connections + 1, dsn)
+        self.conn = self.pool.getconn()
+        self.num_connections = num_connections
+        self.tables = list(TABLE_SCHEMAS)
+        self.rows = {}
+        self.seconds = {}
+        self.worker_rows = {}
+        self.worker_seconds = {}
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        
+        self.executors = []
+        if num_connections > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            # One single-thread executor per worker, so whatever is routed to
+            # a worker loads over its connection in submission order
+            self.executors = [ThreadPoolExecutor(1, thread_name_prefix=f'copy{k}') for k in range(num_connections)]
+            self.next_worker = 0
+            self.worker_conns = {}
+            # Bound the queued chunks so generation cannot run far ahead of the loads
+            self.slots = threading.BoundedSemaphore(2 * num_connections)
+            self.futures = []
+    
+    def create_tables(self, tables=None, line_items=False):
+        """Drop and recreate the star schema tables without keys or indexes
+        
+        tables defaults to every table in TABLE_SCHEMAS; line_items adds the
+        line_number of multi-line baskets to fact_sales.
+        """
+        self.tables = list(tables or TABLE_SCHEMAS)
+        with self.conn.cursor() as cur:
+            for table in self.tables:
+                columns = TABLE_SCHEMAS[table]
+                if table == 'fact_sales':
+                    if line_items:
+                        position = [name for name, _ in columns].index('transaction_id') + 1
+                        columns = columns[:position] + [('line_number', 'INTEGER')] + columns[position:]
+                    # Keys into the time grain tables loaded alongside it
+                    columns = columns + [
+                        (key, 'INTEGER') for grain_table, key, _ in TIME_GRAINS.values() if grain_table in self.tables
+                    ]
+                column_sql = ',\n    '.join(f'{name} {sql_type}' for name, sql_type in columns)
+                cur.execute(f'DROP TABLE IF EXISTS {table} CASCADE')
+                cur.execute(f'CREATE TABLE {table} (\n    {column_sql}\n)')
+        self.conn.commit()
+        self.started = time.perf_counter()
+    
+    def copy_dataframe(self, table, df, worker=None):
+        """COPY one DataFrame (or chunk) into table, in the background when parallel
+        
+        worker picks the load worker (modulo num_connections); by default
+        the workers take turns.
+        """
+        if not self.executors:
+            self._copy(self.conn, 'main', table, df)
+            return
+        if worker is None:
+            worker = self.next_worker
+            self.next_worker = (worker + 1) % self.num_connections
+        self.slots.acquire()
+        # Surface a failed COPY now rather than after generating everything
+        finished = [future for future in self.futures if future.done()]
+        for future in finished:
+            future.result()
+        self.futures = [future for future in self.futures if not future.done()]
+        future = self.executors[worker % self.num_connections].submit(self._copy_on_worker, table, df)
+        future.add_done_callback(lambda _: self.slots.release())
+        self.futures.append(future)
+    
+    def _worker_conn(self):
+        """This load thread's own connection, taken from the pool on first use"""
+        name = threading.current_thread().name
+        with self.lock:
+            if name not in self.worker_conns:
+                self.worker_conns[name] = self.pool.getconn(key=name)
+            return name, self.worker_conns[name]
+    
+    def _copy_on_worker(self, table, df):
+        name, conn = self._worker_conn()
+        self._copy(conn, name, table, df)
+    
+    def _copy(self, conn, worker, table, df):
+        start = time.perf_counter()
+        buffer = self._csv_buffer(table, df)
+        columns = ', '.join(df.columns)
+        with conn.cursor() as cur:
+            cur.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT CSV, NULL '')", buffer)
+        conn.commit()
+        
+        seconds = time.perf_counter() - start
+        with self.lock:
+            self.rows[table] = self.rows.get(table, 0) + len(df)
+            self.seconds[table] = self.seconds.get(table, 0.0) + seconds
+            self.worker_rows[worker] = self.worker_rows.get(worker, 0) + len(df)
+            self.worker_seconds[worker] = self.worker_seconds.get(worker, 0.0) + seconds
+    
+    def _csv_buffer(self, table, df):
+        """Rows of df as headerless CSV for COPY
+        
+        Arrow's CSV writer is several times faster than to_csv and releases
+        the GIL, which lets the load threads overlap; pandas is the fallback.
+        """
+        try:
+            import pyarrow.csv as pa_csv
+        except ImportError:
+            buffer = io.StringIO()
+            self._coerce_to_schema(table, df).to_csv(buffer, index=False, header=False)
+        else:
+            buffer = io.BytesIO()
+            pa_csv.write_csv(_arrow_table(table, df), buffer, pa_csv.WriteOptions(include_header=False))
+        buffer.seek(0)
+        return buffer
+    
+    def _coerce_to_schema(self, table, df):
+        """Make float-with-NaN key columns nullable integers so COPY accepts them"""
+        types = dict(TABLE_SCHEMAS[table])
+        df = df.copy(deep=False)
+        for column in df.columns:
+            if types.get(column) == 'INTEGER' and df[column].dtype.kind == 'f':
+                df[column] = df[column].astype('Int64')
+        return df
+    
+    def wait(self):
+        """Block until every queued COPY has finished, re-raising the first failure"""
+        if not self.executors:
+            return
+        futures, self.futures = self.futures, []
+        for future in futures:
+            future.result()
+    
+    def _execute(self, statements):
+        """Run DDL statements, spread over the load connections when parallel"""
+        if not self.executors:
+            self._execute_serial(statements)
+            return
+        
+        def execute_on_worker(statement):
+            _, conn = self._worker_conn()
+            with conn.cursor() as cur:
+                cur.execute(statement)
+            conn.commit()
+        
+        futures = [
+            self.executors[k % self.num_connections].submit(execute_on_worker, statement)
+            for k, statement in enumerate(statements)
+        ]
+        for future in futures:
+            future.result()
+    
+    def finish(self):
+        """Once every load is done: build keys, indexes and foreign keys, analyze, report"""
+        self.wait()
+        load_seconds = time.perf_counter() - self.started
+        
+        start = time.perf_counter()
+        referenced_keys = [(table, key) for table, key, _ in TIME_GRAINS.values() if table in self.tables]
+        # Order headers are keyed by the transaction_id their line items share
+        if 'fact_order_header' in self.tables:
+            referenced_keys.append(('fact_order_header', 'transaction_id'))
+        self._execute(TABLE_INDEXES + [
+            f"ALTER TABLE {table} ADD PRIMARY KEY ({', '.join(ROLLUP_KEYS[table])})"
+            for table in self.tables if table in ROLLUP_KEYS
+        ] + [f'ALTER TABLE {table} ADD PRIMARY KEY ({key})' for table, key in referenced_keys])
+        # Foreign keys need the primary keys, and each one locks fact_sales
+        self._execute_serial(TABLE_FOREIGN_KEYS + [
+            f'ALTER TABLE fact_sales ADD FOREIGN KEY ({key}) REFERENCES {table} ({key})'
+            for table, key in referenced_keys
+        ])
+        self._execute([f'ANALYZE {table}' for table in self.tables])
+        
+        total_rows = sum(self.rows.values())
+        print(f"\n🐘 PostgreSQL Load ({self.num_connections} connection{'s' if self.num_connections > 1 else ''}):")
+        for table, rows in self.rows.items():
+            seconds = self.seconds[table]
+            print(f"  • {table}: {rows:,} rows in {seconds:.2f}s ({rows / seconds if seconds else 0:,.0f} rows/sec)")
+        if self.executors:
+            for worker, rows in sorted(self.worker_rows.items()):
+                seconds = self.worker_seconds[worker]
+                print(f"  • worker {worker}: {rows:,} rows in {seconds:.2f}s busy ({rows / seconds if seconds else 0:,.0f} rows/sec)")
+        print(f"  • all tables: {total_rows:,} rows in {load_seconds:.2f}s wall ({total_rows / load_seconds if load_seconds else 0:,.0f} rows/sec)")
+        print(f"  • keys + indexes + analyze: {time.perf_counter() - start:.2f}s")
+    
+    def _execute_serial(self, statements):
+        with self.conn.cursor() as cur:
+            for statement in statements:
+                cur.execute(statement)
+        self.conn.commit()
+    
+    def close(self):
+        if self.executors:
+            for executor in self.executors:
+                executor.shutdown(wait=True, cancel_futures=True)
+            for name, conn in self.worker_conns.items():
+                self.pool.putconn(conn, key=name)
+        self.pool.putconn(self.conn)
+        self.pool.closeall()
 
-# Initialize Faker with Indonesian locale
-fake = Faker(['id_ID', 'en_US'])
 
 class DataGenerator:
-    def __init__(self, start_date='2023-01-01', end_date='2024-12-31'):
-        self.fake = fake
+    def __init__(self, start_date='2023-01-01', end_date='2024-12-31', engine='python', seed=None, scale_factor=1):
         self.start_date = datetime.strptime(start_date, '%Y-%m-%d')
         self.end_date = datetime.strptime(end_date, '%Y-%m-%d')
-        self.date_range = pd.date_range(start_date, end_date)
         
-        # Configuration
-        self.num_products = 500
-        self.num_stores = 25
-        self.num_customers = 5000
-        self.num_transactions = 50000
+        # Date with time_id 1; differs from start_date only for incremental batches
+        self.time_origin = self.start_date
+        
+        # Configuration: table sizes come from the scale factor
+        self.set_scale_factor(scale_factor)
+        
+        # Fact generation engine: 'python' builds one dict per row,
+        # 'numpy' draws whole columns per batch with a seeded Generator
+        self.engine = engine
+        self.seed = seed
+        
+        # Fact rows are produced and written in fixed-size chunks; with
+        # streaming enabled the chunks are not kept in memory, and with
+        # part_files each chunk goes to its own numbered CSV
+        self.chunk_size = 100000
+        self.streaming = False
+        self.part_files = False
+        
+        # Sharded fact generation: num_workers processes share the work of
+        # num_shards shards (defaults to one per worker), each with its own
+        # seed derived from self.seed, so output depends only on (seed, shards);
+        # with one worker the shards run in this process
+        self.num_workers = 1
+        self.num_shards = None
+        
+        # Transaction time seasonality: relative weights per weekday (Monday
+        # first) and per hour of day; None means uniform. See
+        # RETAIL_WEEKDAY_WEIGHTS / RETAIL_HOURLY_WEIGHTS for a realistic shape.
+        self.weekday_weights = None
+        self.hourly_weights = None
+        
+        # Output destination: 'csv' files in data/, 'parquet' files in data/
+        # (fact_sales partitioned by month of time_id), or 'postgres' to COPY
+        # straight into the tables at dsn (libpq env vars apply when empty)
+        self.output = 'csv'
+        self.dsn = os.environ.get('DATABASE_URL', '')
+        self.loader = None
+        
+        # Concurrent database load: load_connections COPY workers, each on its
+        # own pooled connection; every load_partition ('batch_id' or 'month')
+        # of fact_sales is loaded by one worker, different ones side by side
+        self.load_connections = 1
+        self.load_partition = 'batch_id'
+        
+        # dim_time is one row per day; time_grain 'hour' also writes
+        # dim_time_hour, and 'minute' dim_time_minute as well (see TIME_GRAINS),
+        # with fact rows carrying the matching hour_id / minute_id keys
+        self.time_grain = 'day'
+        self.holiday_calendar = HolidayCalendar.indonesia()
+        
+        # Draw rows that pass every INTEGRITY_RULES check: return fields follow
+        # is_returned, sales skip discontinued products and closed stores, and
+        # referrers are earlier customers. Off by default, so generated data
+        # keeps the inconsistencies of a real source system.
+        self.enforce_integrity = False
+        
+        # Multi-line baskets: basket_size is the mean number of line items per
+        # transaction (a geometric draw each, at least 1), numpy engine only; 1 keeps
+        # one product per transaction_id. num_transactions then counts
+        # transactions, whose lines share the ORDER_HEADER_COLUMNS and carry a
+        # line_number. order_headers also writes fact_order_header.
+        self.basket_size = 1
+        self.order_headers = False
+        
+        # Also write the ROLLUP_KEYS tables (daily x store, daily x product,
+        # monthly x category), aggregated per chunk during generation
+        self.rollups = False
+        
+        # Faker values (names, addresses, companies, sentences, ...) are drawn
+        # from a pool of faker_pool_size values per kind, and dates without
+        # Faker; the pool size caps distinct values, 0 calls Faker every time.
+        # Pools fill on first use, so they only pay off well below the row
+        # count: at SF1 (5,000 customers) a pool of 1,000 builds dim_customer
+        # about 3.5x faster than Faker alone
+        self.faker_pool_size = 1000
+        self.faker_pools = {}
+        
+        # With a seed, each table reseeds random, Faker and the pools from
+        # (seed, table), and tables whose config hash is unchanged since the
+        # last run are reused from data/manifest.json instead of rebuilt.
+        # reference_date stands in for 'today' in relative dimension dates.
+        self.cache = True
+        self.reference_date = None
+        
+        # Stage timings, throughput, bytes written and peak memory (see
+        # Instrumentation for opt-in profiling); progress lines go to stderr
+        self.instrumentation = Instrumentation()
+        self.progress = True
+        
+        # How fact rows pick each foreign key: 'uniform', 'zipf[:s]' (rank-s
+        # popularity over a shuffled key order), 'pareto[:alpha]' (the default
+        # alpha 1.16 gives the 80/20 rule) or 'weights:<column>' to weight keys
+        # by a dimension attribute such as square_feet or customer_segment
+        self.key_distributions = {'product': 'uniform', 'store': 'uniform', 'customer': 'uniform'}
+        # Seed of the key popularity; None uses seed. Incremental batches
+        # keep the initial run's so the hot keys stay hot night after night
+        self.key_seed = None
+        
+        # Relative weights for text columns used with 'weights:<column>'
+        self.category_weights = {
+            'customer_segment': {'Premium': 8, 'Gold': 4, 'Silver': 2, 'Regular': 1},
+            'store_type': {'Mall': 4, 'Online': 3, 'Standalone': 2, 'Outlet': 2, 'Kiosk': 1},
+        }
         
         # Indonesian cities and regions
         self.indonesian_cities = [
@@ -72,48 +1563,280 @@ class DataGenerator:
         # Store types
         self.store_types = ['Mall', 'Standalone', 'Kiosk', 'Online', 'Outlet']
         
+        # Enum-like fact columns are held as pandas categoricals (integer
+        # codes + these dictionaries) instead of repeated Python strings
+        self.fact_categories = {
+            'discount_type': ['Percentage'],
+            'promotion_id': [f'PROMO-{k}' for k in range(100, 1000)],
+            'promotion_name': ['Summer Sale', 'Flash Sale', 'Member Discount', 'Clearance'],
+            'payment_method': self.payment_methods,
+            'payment_status': ['Completed', 'Pending', 'Failed'],
+            'card_type': ['Visa', 'MasterCard', 'JCB'],
+            'card_last_four': [str(k) for k in range(1000, 10000)],
+            'return_reason': ['Defective', 'Wrong Size', 'Changed Mind', 'Late Delivery'],
+            'sales_channel': ['In-Store', 'Mobile', 'Phone', 'Online'],
+            'source_system': ['POS', 'E-Commerce', 'Mobile App', 'Call Center'],
+        }
+        
+    def __getstate__(self):
+        # Workers get the filled faker_pools with the rest of the state, so
+        # they only build their own Faker if they need values beyond them.
+        # Stage records and callbacks stay with the parent process.
+        state = self.__dict__.copy()
+        state['instrumentation'] = None
+        return state
+    
+    @property
+    def fake(self):
+        """Faker instance, created on first use"""
+        return _get_faker()
+    
+    @property
+    def date_range(self):
+        """Every day from start_date to end_date"""
+        import pandas as pd
+        
+        return pd.date_range(self.start_date, self.end_date)
+    
+    def set_scale_factor(self, scale_factor):
+        """Scale all table sizes together from their SF1 sizes"""
+        self.scale_factor = scale_factor
+        sizes = {name: max(int(round(size * scale_factor)), 1) for name, size in SCALE_FACTOR_1.items()}
+        # At least one product per subcategory
+        sizes['num_products'] = max(sizes['num_products'], 25)
+        for name, size in sizes.items():
+            setattr(self, name, size)
+    
+    def estimate_output(self):
+        """Estimate rows, output bytes and runtime per table before generating"""
+        subcategories = sum(len(subcategories) for subcategories in self.categories.values())
+        num_days = (self.end_date - self.start_date).days + 1
+        rows = {'dim_time': num_days}
+        for grain in self._time_grains():
+            table, _, per_day = TIME_GRAINS[grain]
+            rows[table] = num_days * per_day
+        rows.update({
+            'dim_product': self.num_products // subcategories * subcategories,
+            'dim_store': self.num_stores,
+            'dim_customer': self.num_customers,
+            'fact_sales': int(self.num_transactions * self.basket_size),
+        })
+        if self.order_headers:
+            rows['fact_order_header'] = self.num_transactions
+        bytes_per_row = ESTIMATE_BYTES_PER_ROW.get(self.output, ESTIMATE_BYTES_PER_ROW['csv'])
+        estimate = {}
+        for table, count in rows.items():
+            rate = ESTIMATE_ROWS_PER_SEC[table]
+            if table == 'fact_sales':
+                rate = rate[self.engine] * (min(self.num_workers, self.num_shards or self.num_workers) if self.engine == 'numpy' else 1)
+            estimate[table] = {
+                'rows': count,
+                'bytes': count * bytes_per_row[table],
+                'seconds': count / rate
+            }
+        return estimate
+    
+    def print_estimate(self):
+        """Print the estimate from estimate_output"""
+        estimate = self.estimate_output()
+        print(f"\n📐 Estimate for SF{self.scale_factor:g} ({self.engine} engine, {self.output} output):")
+        for table, values in estimate.items():
+            print(f"  • {table}: {values['rows']:,} rows, ~{values['bytes'] / 1e6:,.1f} MB, ~{values['seconds']:,.0f}s")
+        total_bytes = sum(values['bytes'] for values in estimate.values())
+        total_seconds = sum(values['seconds'] for values in estimate.values())
+        print(f"  Total: ~{total_bytes / 1e6:,.1f} MB in ~{total_seconds / 60:,.1f} min")
+    
+    def _fake_value(self, kind):
+        """One Faker value of the given kind, sampled from its pool when pooling is on
+        
+        The first faker_pool_size calls per kind come from Faker and fill the
+        pool, so pooling never costs more than calling Faker directly.
+        """
+        if not self.faker_pool_size:
+            return getattr(self.fake, kind)()
+        pool = self.faker_pools.setdefault(kind, [])
+        if len(pool) < self.faker_pool_size:
+            value = getattr(self.fake, kind)()
+            pool.append(value)
+            return value
+        return random.choice(pool)
+    
+    def _today(self):
+        """'Today' for relative dates in the dimensions; reference_date pins it"""
+        return self.reference_date or date.today()
+    
+    def _date_between(self, start_date, end_date):
+        """Random date in [start_date, end_date]; end_date may be 'today'"""
+        if end_date == 'today':
+            end_date = self._today()
+        if not self.faker_pool_size:
+            return self.fake.date_between(start_date=start_date, end_date=end_date)
+        return date.fromordinal(random.randint(start_date.toordinal(), max(start_date, end_date).toordinal()))
+    
+    def _date_of_birth(self, minimum_age, maximum_age):
+        """Random birth date for an age in [minimum_age, maximum_age]"""
+        if not self.faker_pool_size:
+            return self.fake.date_of_birth(minimum_age=minimum_age, maximum_age=maximum_age)
+        today = self._today()
+        return self._date_between(
+            start_date=_years_before(today, maximum_age + 1) + timedelta(days=1),
+            end_date=_years_before(today, minimum_age)
+        )
+    
+    def _seed_table(self, table):
+        """Reseed random, Faker and the value pools for one table
+        
+        Every table draws from its own stream derived from (seed, table), so
+        its content does not depend on which tables were generated before it.
+        """
+        import numpy as np
+        
+        if self.seed is None:
+            return
+        table_seed = int(np.random.SeedSequence([self.seed, zlib.crc32(table.encode())]).generate_state(1)[0])
+        random.seed(table_seed)
+        self.fake.seed_instance(table_seed)
+        self.faker_pools = {}
+    
+    def _stage(self, name):
+        """Instrumentation context for one stage of the run"""
+        return self.instrumentation.stage(name)
+    
+    def _record_written(self, path, bytes_before=0):
+        """Count what a write grew path by towards the open stages (not in shard workers)"""
+        if self.instrumentation:
+            self.instrumentation.add_bytes(_path_size(path) - bytes_before)
+    
+    def _streams_fact_sales(self):
+        """Whether fact rows go straight to disk instead of being returned"""
+        return self.streaming or self._fact_shards() is not None
+    
+    def _fact_shards(self):
+        """Number of fact_sales shards, or None when facts are one chunked stream"""
+        if self.num_workers > 1 or self.num_shards:
+            return self.num_shards or self.num_workers
+        return None
+    
     def generate_dim_time(self):
         """Generate time dimension data"""
         print("Generating dim_time data...")
+        self._seed_table('dim_time')
         
-        data = []
-        holidays = [
-            '2023-01-01', '2023-03-22', '2023-04-07', '2023-04-22', '2023-05-01',
-            '2023-05-18', '2023-06-01', '2023-06-29', '2023-07-19', '2023-08-17',
-            '2023-09-28', '2023-12-25',
-            '2024-01-01', '2024-03-11', '2024-03-29', '2024-04-10', '2024-05-01',
-            '2024-05-09', '2024-05-23', '2024-06-01', '2024-06-17', '2024-07-07',
-            '2024-08-17', '2024-09-16', '2024-12-25'
-        ]
+        df = self._dim_time_frame(self.date_range)
+        self._write_table('dim_time', df)
+        print(f"Generated {len(df)} time dimension records")
+        return df
+    
+    def _dim_time_frame(self, dates):
+        """Build dim_time rows for the given dates, one array operation per column"""
+        import numpy as np
+        import pandas as pd
         
-        for single_date in tqdm(self.date_range):
-            date_str = single_date.strftime('%Y-%m-%d')
-            is_weekend = single_date.weekday() >= 5
-            is_holiday = date_str in holidays
-            
-            data.append({
-                'full_date': date_str,
-                'year': single_date.year,
-                'quarter': (single_date.month - 1) // 3 + 1,
-                'month': single_date.month,
-                'month_name': single_date.strftime('%B'),
-                'day_of_month': single_date.day,
-                'day_of_week': single_date.isoweekday(),
-                'day_name': single_date.strftime('%A'),
-                'week_of_year': single_date.isocalendar()[1],
-                'is_weekend': is_weekend,
-                'is_holiday': is_holiday,
-                'holiday_name': 'Holiday' if is_holiday else None
-            })
+        days = np.asarray(dates, dtype='datetime64[D]')
+        months = days.astype('datetime64[M]')
+        years = days.astype('datetime64[Y]')
+        month = (months - years.astype('datetime64[M]')).astype(np.int64) + 1
+        # Monday = 0; 1970-01-01 was a Thursday
+        weekday = (days.astype(np.int64) + 3) % 7
+        # ISO week: the week's Thursday decides which year it belongs to
+        thursday = days + (3 - weekday)
+        week_of_year = (thursday - thursday.astype('datetime64[Y]').astype('datetime64[D]')).astype(np.int64) // 7 + 1
+        is_holiday, holiday_name = self.holiday_calendar.lookup(days)
         
-        df = pd.DataFrame(data)
-        df.to_csv('data/dim_time.csv', index=False, quoting=csv.QUOTE_NONNUMERIC)
-        print(f"Generated {len(df)} time dimension records")
+        return pd.DataFrame({
+            'full_date': np.datetime_as_string(days).astype(object),
+            'year': years.astype(np.int64) + 1970,
+            'quarter': (month - 1) // 3 + 1,
+            'month': month,
+            'month_name': np.asarray(MONTH_NAMES, dtype=object)[month - 1],
+            'day_of_month': (days - months.astype('datetime64[D]')).astype(np.int64) + 1,
+            'day_of_week': weekday + 1,
+            'day_name': np.asarray(DAY_NAMES, dtype=object)[weekday],
+            'week_of_year': week_of_year,
+            'is_weekend': weekday >= 5,
+            'is_holiday': is_holiday,
+            'holiday_name': holiday_name
+        })
+    
+    def _time_grains(self):
+        """The TIME_GRAINS in use, coarsest first ('minute' includes 'hour')"""
+        grains = list(TIME_GRAINS)
+        if self.time_grain == 'day':
+            return []
+        if self.time_grain not in grains:
+            raise ValueError(f"time_grain must be 'day', 'hour' or 'minute', not '{self.time_grain}'")
+        return grains[:grains.index(self.time_grain) + 1]
+    
+    def generate_dim_time_grain(self, grain):
+        """Generate dim_time_hour or dim_time_minute data for the date range"""
+        table = TIME_GRAINS[grain][0]
+        print(f"Generating {table} data...")
+        
+        df = self._time_grain_frame(grain, self.date_range)
+        self._write_table(table, df)
+        print(f"Generated {len(df):,} {table} records")
+        return df
+    
+    def _time_grain_frame(self, grain, dates):
+        """Rows of one TIME_GRAINS table for the given dates
+        
+        Day attributes are computed once per day and repeated across its
+        hours or minutes, so the cost is a few array copies per column.
+        """
+        import numpy as np
+        import pandas as pd
+        
+        table, key, per_day = TIME_GRAINS[grain]
+        days = np.asarray(dates, dtype='datetime64[D]')
+        day_offset = (days - np.datetime64(self.time_origin.date(), 'D')).astype(np.int64)
+        weekday = (days.astype(np.int64) + 3) % 7
+        is_holiday, _ = self.holiday_calendar.lookup(days)
+        
+        day = np.repeat(np.arange(len(days)), per_day)
+        slot = np.tile(np.arange(per_day), len(days))
+        minutes = slot * (1440 // per_day)
+        hour = minutes // 60
+        
+        columns = {key: (day_offset[day] * per_day + slot + 1).astype(np.int32)}
+        if grain == 'minute':
+            columns['hour_id'] = (day_offset[day] * 24 + hour + 1).astype(np.int32)
+        columns.update({
+            'time_id': (day_offset[day] + 1).astype(np.int32),
+            'full_date': np.datetime_as_string(days).astype(object)[day],
+            'hour': hour.astype(np.int8),
+        })
+        if grain == 'minute':
+            columns['minute'] = (minutes % 60).astype(np.int8)
+        columns.update({
+            'day_part': pd.Categorical.from_codes(hour // 6, DAY_PARTS),
+            'is_weekend': (weekday >= 5)[day],
+            'is_holiday': is_holiday[day],
+        })
+        return pd.DataFrame(columns)
+    
+    def _add_time_keys(self, df):
+        """Add the hour_id / minute_id of each fact row for the TIME_GRAINS in use"""
+        import numpy as np
+        import pandas as pd
+        
+        grains = self._time_grains()
+        if not grains:
+            return df
+        seconds = (
+            pd.to_datetime(df['transaction_time']).to_numpy().astype('datetime64[s]')
+            - np.datetime64(self.time_origin.date(), 's')
+        ).astype(np.int64)
+        for grain in grains:
+            _, key, per_day = TIME_GRAINS[grain]
+            df[key] = (seconds // (86400 // per_day) + 1).astype(np.int32)
         return df
     
     def generate_dim_product(self):
         """Generate product dimension data"""
+        import pandas as pd
+        
         print("Generating dim_product data...")
+        self._seed_table('dim_product')
         
         data = []
         product_id = 1
@@ -124,7 +1847,7 @@ class DataGenerator:
                 
                 for _ in range(num_products_in_subcat):
                     brand = random.choice(self.brands.get(category, ['Generic']))
-                    product_name = f"{brand} {self.fake.word().capitalize()} {random.choice(['Pro', 'Lite', 'Max', 'Plus', ''])}".strip()
+                    product_name = f"{brand} {self._fake_value('word').capitalize()} {random.choice(['Pro', 'Lite', 'Max', 'Plus', ''])}".strip()
                     
                     # Generate realistic pricing
                     if category == 'Electronics':
@@ -137,7 +1860,7 @@ class DataGenerator:
                         unit_cost = round(random.uniform(5, 100), 2)
                         unit_price = round(unit_cost * random.uniform(1.3, 2.5), 2)
                     
-                    created_date = self.fake.date_between(
+                    created_date = self._date_between(
                         start_date=date(2022, 1, 1),
                         end_date='today'
                     )
@@ -146,7 +1869,7 @@ class DataGenerator:
                     is_discontinued = random.random() < 0.1
                     discontinued_date = None
                     if is_discontinued:
-                        discontinued_date = self.fake.date_between(
+                        discontinued_date = self._date_between(
                             start_date=created_date,
                             end_date='today'
                         )
@@ -155,14 +1878,14 @@ class DataGenerator:
                         'product_id': product_id,
                         'product_sku': f'SKU-{category[:3].upper()}-{product_id:06d}',
                         'product_name': product_name,
-                        'product_description': self.fake.sentence(),
-                        'category_id': hash(category) % 1000,
+                        'product_description': self._fake_value('sentence'),
+                        'category_id': _stable_id(category, 1000),
                         'category_name': category,
-                        'subcategory_id': hash(subcategory) % 1000,
+                        'subcategory_id': _stable_id(subcategory, 1000),
                         'subcategory_name': subcategory,
                         'brand': brand,
                         'supplier_id': random.randint(1, 50),
-                        'supplier_name': self.fake.company(),
+                        'supplier_name': self._fake_value('company'),
                         'manufacturer': brand,
                         'unit_cost': unit_cost,
                         'unit_price': unit_price,
@@ -174,7 +1897,7 @@ class DataGenerator:
                         'is_discontinued': is_discontinued,
                         'created_date': created_date.strftime('%Y-%m-%d'),
                         'discontinued_date': discontinued_date.strftime('%Y-%m-%d') if discontinued_date else None,
-                        'last_restock_date': self.fake.date_between(
+                        'last_restock_date': self._date_between(
                             start_date=date(2023, 11, 1),
                             end_date='today'
                         ).strftime('%Y-%m-%d')
@@ -183,13 +1906,16 @@ class DataGenerator:
                     product_id += 1
         
         df = pd.DataFrame(data)
-        df.to_csv('data/dim_product.csv', index=False, quoting=csv.QUOTE_NONNUMERIC)
+        self._write_table('dim_product', df)
         print(f"Generated {len(df)} product dimension records")
         return df
     
     def generate_dim_store(self):
         """Generate store dimension data"""
+        import pandas as pd
+        
         print("Generating dim_store data...")
+        self._seed_table('dim_store')
         
         data = []
         
@@ -205,12 +1931,12 @@ class DataGenerator:
                 has_parking = False
                 has_cafe = False
             else:
-                address = self.fake.address().replace('\n', ', ')
+                address = self._fake_value('address').replace('\n', ', ')
                 square_feet = random.choice([800, 1200, 2000, 3000, 5000])
                 has_parking = store_type == 'Mall'
                 has_cafe = store_type in ['Mall', 'Standalone']
             
-            opening_date = self.fake.date_between(
+            opening_date = self._date_between(
                 start_date=date(2019, 1, 1),
                 end_date=date(2023, 1, 1)
             )
@@ -219,7 +1945,7 @@ class DataGenerator:
             is_active = random.random() > 0.05
             closing_date = None
             if not is_active:
-                closing_date = self.fake.date_between(
+                closing_date = self._date_between(
                     start_date=opening_date,
                     end_date='today'
                 )
@@ -230,9 +1956,9 @@ class DataGenerator:
                 'store_name': f'{city} {store_type} Store {i}',
                 'store_type': store_type,
                 'store_format': random.choice(['Supermarket', 'Convenience', 'Hypermarket', 'Specialty']),
-                'region_id': hash(region) % 100,
+                'region_id': _stable_id(region, 100),
                 'region_name': region,
-                'subregion_id': hash(f"{region}_sub") % 100,
+                'subregion_id': _stable_id(f"{region}_sub", 100),
                 'subregion_name': f'{region} Subregion',
                 'city': city,
                 'state_province': region,
@@ -242,7 +1968,7 @@ class DataGenerator:
                 'latitude': round(random.uniform(-6.2, -6.1), 6) if city == 'Jakarta' else round(random.uniform(-7.0, -5.0), 6),
                 'longitude': round(random.uniform(106.7, 106.9), 6) if city == 'Jakarta' else round(random.uniform(107.0, 110.0), 6),
                 'manager_id': random.randint(1000, 2000),
-                'manager_name': self.fake.name(),
+                'manager_name': self._fake_value('name'),
                 'employee_count': random.randint(5, 50),
                 'square_feet': square_feet,
                 'number_of_floors': random.randint(1, 3),
@@ -250,7 +1976,7 @@ class DataGenerator:
                 'has_cafe': has_cafe,
                 'opening_date': opening_date.strftime('%Y-%m-%d'),
                 'closing_date': closing_date.strftime('%Y-%m-%d') if closing_date else None,
-                'renovation_date': self.fake.date_between(
+                'renovation_date': self._date_between(
                     start_date=opening_date,
                     end_date='today'
                 ).strftime('%Y-%m-%d') if random.random() > 0.7 else None,
@@ -261,19 +1987,22 @@ class DataGenerator:
             })
         
         df = pd.DataFrame(data)
-        df.to_csv('data/dim_store.csv', index=False, quoting=csv.QUOTE_NONNUMERIC)
+        self._write_table('dim_store', df)
         print(f"Generated {len(df)} store dimension records")
         return df
     
     def generate_dim_customer(self):
         """Generate customer dimension data"""
+        import pandas as pd
+        
         print("Generating dim_customer data...")
+        self._seed_table('dim_customer')
         
         data = []
         
         for i in range(1, self.num_customers + 1):
-            first_name = self.fake.first_name()
-            last_name = self.fake.last_name()
+            first_name = self._fake_value('first_name')
+            last_name = self._fake_value('last_name')
             city = random.choice(self.indonesian_cities)
             
             # Customer segmentation
@@ -290,7 +2019,7 @@ class DataGenerator:
                 segment = 'Regular'
                 tier = 'Bronze'
             
-            registration_date = self.fake.date_between(
+            registration_date = self._date_between(
                 start_date=date(2021, 1, 1),
                 end_date='today'
             )
@@ -302,29 +2031,32 @@ class DataGenerator:
             average_order_value = 0
             
             if random.random() > 0.3:  # 70% of customers have made purchases
-                first_purchase_date = self.fake.date_between(
+                first_purchase_date = self._date_between(
                     start_date=registration_date,
                     end_date='today'
                 )
-                last_purchase_date = self.fake.date_between(
+                last_purchase_date = self._date_between(
                     start_date=first_purchase_date,
                     end_date='today'
                 )
                 purchase_frequency = random.randint(1, 50)
                 average_order_value = round(random.uniform(50, 500), 2)
             
+            # Enforced referrals point at an earlier customer, never the customer itself
+            max_referrer = i - 1 if self.enforce_integrity else self.num_customers
+            
             data.append({
                 'customer_id': i,
                 'customer_code': f'CUST-{i:06d}',
                 'first_name': first_name,
                 'last_name': last_name,
-                'email': f'{first_name.lower()}.{last_name.lower()}@{self.fake.free_email_domain()}',
+                'email': f'{first_name.lower()}.{last_name.lower()}@{self._fake_value("free_email_domain")}',
                 'phone': f'+62{random.randint(811, 899)}{random.randint(1000000, 9999999)}',
                 'phone_secondary': f'+62{random.randint(811, 899)}{random.randint(1000000, 9999999)}' if random.random() > 0.5 else None,
-                'birth_date': self.fake.date_of_birth(minimum_age=18, maximum_age=70).strftime('%Y-%m-%d'),
+                'birth_date': self._date_of_birth(minimum_age=18, maximum_age=70).strftime('%Y-%m-%d'),
                 'gender': random.choice(['Male', 'Female', 'Other']),
                 'marital_status': random.choice(['Single', 'Married', 'Divorced', 'Widowed']),
-                'address': self.fake.address().replace('\n', ', '),
+                'address': self._fake_value('address').replace('\n', ', '),
                 'city': city,
                 'state_province': self.regions.get(city, 'Java'),
                 'postal_code': str(random.randint(10000, 99999)),
@@ -340,7 +2072,7 @@ class DataGenerator:
                 'loyalty_points': random.randint(0, 5000),
                 'loyalty_tier': random.choice(['Bronze', 'Silver', 'Gold', 'Platinum']),
                 'referral_code': f'REF{random.randint(10000, 99999)}',
-                'referred_by_id': random.randint(1, self.num_customers) if random.random() > 0.8 and i > 1 else None,
+                'referred_by_id': random.randint(1, max_referrer) if random.random() > 0.8 and i > 1 else None,
                 'email_opt_in': random.random() > 0.3,
                 'sms_opt_in': random.random() > 0.7,
                 'is_active': random.random() > 0.1,
@@ -349,34 +2081,364 @@ class DataGenerator:
             })
         
         df = pd.DataFrame(data)
-        df.to_csv('data/dim_customer.csv', index=False, quoting=csv.QUOTE_NONNUMERIC)
+        self._write_table('dim_customer', df)
         print(f"Generated {len(df)} customer dimension records")
         return df
     
     def generate_fact_sales(self, dim_products, dim_stores, dim_customers):
-        """Generate fact sales data"""
-        print("Generating fact_sales data...")
+        """Generate fact sales data chunk by chunk
         
-        data = []
+        Returns the full DataFrame, or only the row count when streaming
+        or running in parallel.
+        """
+        import pandas as pd
         
-        # Create date range for transactions
-        transaction_dates = pd.date_range(
-            self.start_date,
-            self.end_date,
-            freq='h'
-        )
+        self._seed_table('fact_sales')
         
-        # Sample transactions
-        transaction_dates = random.sample(
-            list(transaction_dates),
-            min(self.num_transactions, len(transaction_dates))
-        )
+        # Clear output left over from a previous run
+        for table in ('fact_sales', 'fact_order_header'):
+            for name in os.listdir('data'):
+                if name == f'{table}.csv' or name.startswith(f'{table}.part-'):
+                    os.remove(os.path.join('data', name))
+            shutil.rmtree(f'data/{table}', ignore_errors=True)
         
-        for i, transaction_time in enumerate(tqdm(transaction_dates)):
-            # Select random dimension keys
-            product = random.choice(dim_products)
-            store = random.choice(dim_stores)
-            customer = random.choice(dim_customers) if random.random() > 0.2 else None
+        if self._fact_shards():
+            if self.output == 'postgres':
+                raise ValueError("sharded fact generation only supports output='csv' or 'parquet'")
+            return self._generate_fact_sales_parallel(dim_products, dim_stores, dim_customers)
+        
+        print(f"Generating fact_sales data ({self.engine} engine)...")
+        
+        if self.engine == 'numpy':
+            chunks = self._iter_fact_sales_numpy(dim_products, dim_stores, dim_customers)
+        else:
+            chunks = self._iter_fact_sales_python(dim_products, dim_stores, dim_customers)
+        
+        kept = []
+        num_rows = 0
+        
+        # Summary statistics and rollups are accumulated per chunk, not from the full table
+        products = pd.DataFrame(dim_products)
+        self.sales_statistics = self._new_sales_statistics(products['product_id'], products['category_name'])
+        rollups = self._new_sales_rollups(products['product_id'], products['category_name'])
+        
+        for chunk_index, df in enumerate(chunks):
+            self._add_derived_columns(df)
+            self._write_fact_chunk(df, chunk_index)
+            self.sales_statistics.update(df)
+            if rollups:
+                rollups.update(df)
+            num_rows += len(df)
+            if not self.streaming:
+                kept.append(df)
+        
+        print(f"Generated {num_rows} sales fact records")
+        self._write_rollups(rollups)
+        if self.streaming:
+            return num_rows
+        return pd.concat(kept, ignore_index=True) if kept else pd.DataFrame()
+    
+    def _generate_fact_sales_parallel(self, dim_products, dim_stores, dim_customers):
+        """Generate fact sales shards and return the row count
+        
+        Shards run in a process pool when num_workers > 1 and one after
+        another in this process otherwise, with the same seeds and files.
+        """
+        import numpy as np
+        
+        if self.engine != 'numpy':
+            raise ValueError("sharded fact generation requires engine='numpy'")
+        
+        num_shards = self._fact_shards()
+        print(f"Generating fact_sales data ({num_shards} shards on {self.num_workers} workers)...")
+        
+        # Each shard draws its own rows, timestamps included, from a child seed
+        seeds = np.random.SeedSequence(self.seed).spawn(num_shards)
+        bounds = np.linspace(0, self.num_transactions, num_shards + 1).astype(int)
+        tasks = [
+            (k, seeds[k], int(bounds[k + 1] - bounds[k]), int(bounds[k]))
+            for k in range(num_shards)
+        ]
+        
+        # Dimension arrays go to each worker once through the pool initializer
+        # (inherited copy-on-write under fork) rather than with every task
+        dims = self._fact_dimension_arrays(dim_products, dim_stores, dim_customers)
+        progress = Progress(num_shards, 'fact_sales shards', self.progress)
+        results = []
+        if self.num_workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                initializer=_init_fact_worker,
+                initargs=(self, dims)
+            ) as executor:
+                for result in executor.map(_generate_fact_shard, tasks):
+                    results.append(result)
+                    progress.update()
+        else:
+            # Same entry point as the pool, on a copy without the instrumentation
+            _init_fact_worker(copy.copy(self), dims)
+            for task in tasks:
+                results.append(_generate_fact_shard(task))
+                progress.update()
+            _worker_state.clear()
+        progress.close()
+        
+        num_rows = sum(r['rows'] for r in results)
+        self.sales_statistics = self._new_sales_statistics(dims['products']['product_id'], dims['products']['category_name'])
+        rollups = self._new_sales_rollups(dims['products']['product_id'], dims['products']['category_name'])
+        for result in results:
+            self.sales_statistics.merge(result['statistics'])
+            if rollups:
+                rollups.merge(result['rollups'])
+        
+        # Concatenate shards in order, keeping only the first header
+        if self.output == 'csv' and not self.part_files:
+            for table in self._fact_tables():
+                with open(f'data/{table}.csv', 'wb') as out:
+                    header_written = False
+                    for result in results:
+                        if not result['rows']:
+                            continue
+                        with open(result['paths'][table], 'rb') as part:
+                            if header_written:
+                                part.readline()
+                            shutil.copyfileobj(part, out)
+                        header_written = True
+                        os.remove(result['paths'][table])
+                self._record_written(f'data/{table}.csv')
+        else:
+            self.instrumentation.add_bytes(sum(result['bytes'] for result in results))
+        
+        print(f"Generated {num_rows} sales fact records")
+        self._write_rollups(rollups)
+        return num_rows
+    
+    def _write_fact_shard(self, shard_index, seed_seq, num_rows, offset, dims):
+        """Generate one shard chunk by chunk into its own part file"""
+        import numpy as np
+        
+        rng = np.random.default_rng(seed_seq)
+        result = {
+            'paths': {table: f'data/{table}.part-{shard_index:05d}.csv' for table in self._fact_tables()},
+            'rows': 0,
+            'statistics': self._new_sales_statistics(dims['products']['product_id'], dims['products']['category_name']),
+            'rollups': self._new_sales_rollups(dims['products']['product_id'], dims['products']['category_name'])
+        }
+        
+        # num_rows counts transactions; a chunk holds about chunk_size line items
+        per_chunk = self._transactions_per_chunk()
+        for start in range(0, num_rows, per_chunk):
+            df = self._fact_sales_batch(
+                rng,
+                self._sample_transaction_times(rng, min(per_chunk, num_rows - start)),
+                offset + start,
+                dims
+            )
+            self._add_derived_columns(df)
+            for table, frame in self._fact_table_chunks(df).items():
+                if self.output == 'parquet':
+                    self._write_table(table, frame, part=f'{shard_index:05d}-{start // per_chunk:05d}')
+                else:
+                    frame.to_csv(
+                        result['paths'][table],
+                        mode='w' if start == 0 else 'a',
+                        header=start == 0,
+                        index=False,
+                        quoting=csv.QUOTE_NONNUMERIC
+                    )
+            result['rows'] += len(df)
+            result['statistics'].update(df)
+            if result['rollups']:
+                result['rollups'].update(df)
+        
+        # Workers have no instrumentation, so the parent adds up the shards' bytes
+        if self.output == 'parquet':
+            paths = [
+                path for table in self._fact_tables()
+                for path in glob.glob(f'data/{table}/**/part-{shard_index:05d}-*.parquet', recursive=True)
+            ]
+        else:
+            paths = result['paths'].values()
+        result['bytes'] = sum(_path_size(path) for path in paths)
+        return result
+    
+    def _new_sales_statistics(self, product_ids, product_categories):
+        """Empty summary statistics accumulator for these products"""
+        return SalesStatistics(product_ids, product_categories, self.fact_categories['sales_channel'])
+    
+    def _new_sales_rollups(self, product_ids, product_categories):
+        """Empty rollup accumulator for these products, or None when rollups are off"""
+        if not self.rollups:
+            return None
+        return SalesRollups(product_ids, product_categories, self.time_origin)
+    
+    def _write_rollups(self, rollups):
+        """Write each finished rollup table to the output destination"""
+        if not rollups:
+            return
+        for table in ROLLUP_KEYS:
+            df = rollups.table(table)
+            self._write_table(table, df)
+            print(f"Generated {len(df)} {table} records")
+    
+    def _add_derived_columns(self, df):
+        """Calculate derived amount columns, and any finer time keys, in place"""
+        df['total_amount'] = df['quantity'] * df['unit_price']
+        df['net_amount'] = df['total_amount'] - df['discount_amount']
+        df['tax_amount'] = df['net_amount'] * df['tax_rate'] / 100
+        df['gross_amount'] = df['net_amount'] + df['tax_amount'] + df['service_fee'] + df['shipping_fee']
+        return self._add_time_keys(df)
+    
+    def _write_table(self, table, df, append=False, part='00000'):
+        """Write a table (or an appended chunk of it) to the output destination
+        
+        part names the file a fact chunk lands in for partitioned Parquet.
+        """
+        if self.output == 'postgres':
+            if table in ('fact_sales', 'fact_order_header') and self.loader.num_connections > 1:
+                # One COPY per worker and chunk, with every partition on its own worker
+                for worker, rows in df.groupby(self._load_workers(df), sort=False):
+                    self.loader.copy_dataframe(table, rows, worker)
+            else:
+                self.loader.copy_dataframe(table, df)
+        elif self.output == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            
+            if table in ('fact_sales', 'fact_order_header'):
+                bytes_before = _path_size(f'data/{table}')
+                pq.write_to_dataset(
+                    _arrow_table(table, df).append_column('sale_month', pa.array(self._sale_months(df))),
+                    f'data/{table}',
+                    partition_cols=['sale_month'],
+                    basename_template=f'part-{part}-{{i}}.parquet',
+                    compression='zstd'
+                )
+                self._record_written(f'data/{table}', bytes_before)
+            else:
+                pq.write_table(_arrow_table(table, df), f'data/{table}.parquet', compression='zstd')
+                self._record_written(f'data/{table}.parquet')
+        else:
+            path = f'data/{table}.csv'
+            bytes_before = _path_size(path) if append else 0
+            df.to_csv(
+                path,
+                mode='a' if append else 'w',
+                header=not append,
+                index=False,
+                quoting=csv.QUOTE_NONNUMERIC
+            )
+            self._record_written(path, bytes_before)
+    
+    def _write_fact_chunk(self, df, chunk_index):
+        """Write one fact chunk (and its order headers) to fact_sales.csv or to its own part file"""
+        for table, frame in self._fact_table_chunks(df).items():
+            if self.part_files and self.output == 'csv':
+                frame.to_csv(f'data/{table}.part-{chunk_index:05d}.csv', index=False, quoting=csv.QUOTE_NONNUMERIC)
+                self._record_written(f'data/{table}.part-{chunk_index:05d}.csv')
+            else:
+                self._write_table(table, frame, append=chunk_index > 0, part=f'{chunk_index:05d}')
+    
+    def _fact_tables(self):
+        """Fact tables written chunk by chunk: fact_sales, and fact_order_header when enabled"""
+        return ['fact_sales', 'fact_order_header'] if self.order_headers else ['fact_sales']
+    
+    def _fact_table_chunks(self, df):
+        """The chunk of each fact table for one fact_sales chunk (derived columns already calculated)"""
+        if not self.order_headers:
+            return {'fact_sales': df}
+        return {'fact_sales': df, 'fact_order_header': self._order_header_frame(df)}
+    
+    def _order_header_frame(self, df):
+        """One fact_order_header row per transaction in a fact_sales chunk
+        
+        A chunk holds whole transactions with their lines in order, so each
+        transaction starts at its line_number 1 and its measures are one
+        reduceat over the lines that follow.
+        """
+        import numpy as np
+        
+        if 'line_number' in df:
+            starts = np.flatnonzero(df['line_number'].to_numpy() == 1)
+        else:
+            starts = np.arange(len(df))
+        header = df[ORDER_HEADER_COLUMNS].iloc[starts].reset_index(drop=True)
+        header['line_count'] = np.diff(np.append(starts, len(df))).astype(np.int32)
+        for measure in ORDER_MEASURES:
+            values = df[measure].to_numpy()
+            # Widen small integer columns (quantity is int8) before summing
+            header[measure] = np.add.reduceat(values.astype(np.int64) if values.dtype.kind == 'i' else values, starts)
+        return header
+    
+    def _transactions_per_chunk(self):
+        """Transactions per generated chunk, so a chunk holds about chunk_size line items"""
+        return max(int(self.chunk_size // self.basket_size), 1)
+    
+    def _load_partitions(self, df):
+        """Partition key per fact row for the concurrent database load"""
+        if self.load_partition == 'month':
+            return self._sale_months(df)
+        if self.load_partition == 'batch_id':
+            return df['batch_id'].to_numpy()
+        raise ValueError(f"load_partition must be 'batch_id' or 'month', not '{self.load_partition}'")
+    
+    def _load_workers(self, df):
+        """Load worker per fact row: a stable hash of its partition key modulo load_connections"""
+        import numpy as np
+        import pandas as pd
+        
+        codes, partitions = pd.factorize(self._load_partitions(df))
+        workers = np.array([_stable_id(str(partition), self.load_connections) for partition in partitions], dtype=np.int64)
+        return workers[codes]
+    
+    def _sale_months(self, df):
+        """Partition key 'YYYY-MM' for each fact row, from its day-grain time_id"""
+        import numpy as np
+        
+        dates = np.datetime64(self.time_origin.date(), 'D') + (df['time_id'].to_numpy() - 1).astype('timedelta64[D]')
+        return dates.astype('datetime64[M]').astype(str).astype(object)
+    
+    def _iter_fact_sales_python(self, dim_products, dim_stores, dim_customers, first_seq=0):
+        """Generate fact sales rows one dict at a time, yielding a DataFrame per chunk"""
+        import numpy as np
+        import pandas as pd
+        
+        if self.basket_size > 1:
+            raise ValueError("basket_size > 1 requires engine='numpy'")
+        data = []
+        dim_products = _records(dim_products)
+        dim_stores = _records(dim_stores)
+        dim_customers = _records(dim_customers)
+        product_sampler = self._key_sampler('product', dim_products)
+        store_sampler = self._key_sampler('store', dim_stores)
+        customer_sampler = self._key_sampler('customer', dim_customers)
+        
+        rng = np.random.default_rng(self.seed)
+        
+        progress = Progress(self.num_transactions, 'fact_sales rows', self.progress)
+        for n in range(self.num_transactions):
+            # Sample transaction timestamps one chunk at a time
+            if n % self.chunk_size == 0:
+                transaction_times = self._sample_transaction_times(
+                    rng,
+                    min(self.chunk_size, self.num_transactions - n)
+                )
+            transaction_time = transaction_times[n % self.chunk_size]
+            i = first_seq + n
+            
+            # Select random dimension keys; enforced draws repeat until the
+            # product is still sold and the store open on the transaction day
+            for _ in range(100):
+                product = dim_products[product_sampler.draw()] if product_sampler else random.choice(dim_products)
+                store = dim_stores[store_sampler.draw()] if store_sampler else random.choice(dim_stores)
+                if not self.enforce_integrity or self._on_sale(product, store, transaction_time.strftime('%Y-%m-%d')):
+                    break
+            else:
+                raise ValueError(f"No product on sale in an open store on {transaction_time.date()}")
+            customer = None
+            if random.random() > 0.2:
+                customer = dim_customers[customer_sampler.draw()] if customer_sampler else random.choice(dim_customers)
             
             # Generate transaction details
             quantity = random.randint(1, 5)
@@ -401,13 +2463,13 @@ class DataGenerator:
                 online_order_id = None
             
             data.append({
-                'time_id': (transaction_time.date() - self.start_date.date()).days + 1,
+                'time_id': (transaction_time.date() - self.time_origin.date()).days + 1,
                 'product_id': product['product_id'],
                 'store_id': store['store_id'],
                 'customer_id': customer['customer_id'] if customer else None,
                 'transaction_id': f'TXN-{transaction_time.strftime("%Y%m%d%H%M%S")}-{i:06d}',
                 'sales_person_id': random.randint(1000, 2000),
-                'sales_person_name': self.fake.name(),
+                'sales_person_name': self._fake_value('name'),
                 'quantity': quantity,
                 'unit_price': unit_price,
                 'unit_cost': product['unit_cost'],
@@ -423,29 +2485,374 @@ class DataGenerator:
                 'payment_status': random.choice(['Completed', 'Completed', 'Completed', 'Pending', 'Failed']),
                 'card_type': random.choice(['Visa', 'MasterCard', 'JCB']) if payment_method in ['Credit Card', 'Debit Card'] else None,
                 'card_last_four': str(random.randint(1000, 9999)) if payment_method in ['Credit Card', 'Debit Card'] else None,
-                'is_returned': random.random() < 0.03,
-                'return_reason': random.choice(['Defective', 'Wrong Size', 'Changed Mind', 'Late Delivery']) if random.random() < 0.03 else None,
-                'return_date': (transaction_time + timedelta(days=random.randint(1, 14))).strftime('%Y-%m-%d') if random.random() < 0.03 else None,
-                'refund_amount': round(random.uniform(0, unit_price * quantity), 2) if random.random() < 0.03 else None,
+                **self._return_fields(transaction_time, unit_price, quantity),
                 'sales_channel': sales_channel,
                 'online_order_id': online_order_id,
                 'transaction_time': transaction_time.strftime('%Y-%m-%d %H:%M:%S'),
                 'source_system': random.choice(['POS', 'E-Commerce', 'Mobile App', 'Call Center']),
-                'batch_id': random.randint(1, 10)
+                'batch_id': random.randint(1, INITIAL_BATCHES)
             })
+            
+            if len(data) == self.chunk_size:
+                progress.update(len(data))
+                yield self._compact_fact_chunk(pd.DataFrame(data))
+                data = []
         
-        df = pd.DataFrame(data)
+        if data:
+            progress.update(len(data))
+            yield self._compact_fact_chunk(pd.DataFrame(data))
+        progress.close()
+    
+    def _on_sale(self, product, store, day):
+        """Whether a product record was still sold, and a store record open, on day ('YYYY-MM-DD')"""
+        discontinued = product['discontinued_date']
+        closing = store['closing_date']
+        return (
+            not (isinstance(discontinued, str) and day > discontinued)
+            and store['opening_date'] <= day
+            and not (isinstance(closing, str) and day > closing)
+        )
+    
+    def _return_fields(self, transaction_time, unit_price, quantity):
+        """Return columns of one python-engine row
         
-        # Calculate derived columns
-        df['total_amount'] = df['quantity'] * df['unit_price']
-        df['net_amount'] = df['total_amount'] - df['discount_amount']
-        df['tax_amount'] = df['net_amount'] * df['tax_rate'] / 100
-        df['gross_amount'] = df['net_amount'] + df['tax_amount'] + df['service_fee'] + df['shipping_fee']
+        By default the reason, date and refund are each drawn on their own
+        and can disagree with is_returned; enforce_integrity derives all of
+        them from is_returned.
+        """
+        is_returned = random.random() < 0.03
+        if self.enforce_integrity:
+            return {
+                'is_returned': is_returned,
+                'return_reason': random.choice(self.fact_categories['return_reason']) if is_returned else None,
+                'return_date': (transaction_time + timedelta(days=random.randint(1, 14))).strftime('%Y-%m-%d') if is_returned else None,
+                'refund_amount': round(random.uniform(0, unit_price * quantity), 2) if is_returned else None,
+            }
+        return {
+            'is_returned': is_returned,
+            'return_reason': random.choice(['Defective', 'Wrong Size', 'Changed Mind', 'Late Delivery']) if random.random() < 0.03 else None,
+            'return_date': (transaction_time + timedelta(days=random.randint(1, 14))).strftime('%Y-%m-%d') if random.random() < 0.03 else None,
+            'refund_amount': round(random.uniform(0, unit_price * quantity), 2) if random.random() < 0.03 else None,
+        }
+    
+    def _compact_fact_chunk(self, df):
+        """Convert a row-built chunk to the same compact dtypes as the numpy engine"""
+        import pandas as pd
         
-        df.to_csv('data/fact_sales.csv', index=False, quoting=csv.QUOTE_NONNUMERIC)
-        print(f"Generated {len(df)} sales fact records")
+        for column, categories in self.fact_categories.items():
+            df[column] = pd.Categorical(df[column], categories=categories)
+        df['sales_person_name'] = df['sales_person_name'].astype('category')
+        df['transaction_time'] = pd.to_datetime(df['transaction_time']).astype('datetime64[s]')
+        df['return_date'] = pd.to_datetime(df['return_date']).astype('datetime64[s]')
         return df
     
+    def _iter_fact_sales_numpy(self, dim_products, dim_stores, dim_customers, first_seq=0):
+        """Generate fact sales columns per chunk with a seeded NumPy Generator"""
+        import numpy as np
+        
+        rng = np.random.default_rng(self.seed)
+        dims = self._fact_dimension_arrays(dim_products, dim_stores, dim_customers)
+        
+        # Chunks hold whole transactions, about chunk_size line items each
+        per_chunk = self._transactions_per_chunk()
+        progress = Progress(self.num_transactions, 'fact_sales transactions', self.progress)
+        for offset in range(0, self.num_transactions, per_chunk):
+            num_chunk_transactions = min(per_chunk, self.num_transactions - offset)
+            df = self._fact_sales_batch(
+                rng,
+                self._sample_transaction_times(rng, num_chunk_transactions),
+                first_seq + offset,
+                dims
+            )
+            progress.update(num_chunk_transactions)
+            yield df
+        progress.close()
+    
+    def _sample_transaction_times(self, rng, n):
+        """Sample n transaction timestamps at second resolution
+        
+        Days are drawn with weekday seasonality and hours with intraday
+        seasonality, so cost scales with n rather than with the date range.
+        """
+        import numpy as np
+        import pandas as pd
+        
+        day_p, hour_p = self._timestamp_probabilities()
+        days = rng.choice(len(day_p), n, p=day_p)
+        hours = rng.choice(24, n, p=hour_p)
+        seconds = days * 86400 + hours * 3600 + rng.integers(0, 3600, n)
+        return pd.DatetimeIndex(np.datetime64(self.start_date.date(), 's') + seconds.astype('timedelta64[s]'))
+    
+    def _timestamp_probabilities(self):
+        """Per-day and per-hour sampling probabilities for the date range"""
+        import numpy as np
+        
+        weekday_weights = np.asarray(self.weekday_weights or [1] * 7, dtype=float)
+        hourly_weights = np.asarray(self.hourly_weights or [1] * 24, dtype=float)
+        
+        # One weight per day in the range (Monday = 0), not per candidate timestamp
+        num_days = (self.end_date.date() - self.start_date.date()).days + 1
+        first_weekday = self.start_date.weekday()
+        day_weights = weekday_weights[(first_weekday + np.arange(num_days)) % 7]
+        return day_weights / day_weights.sum(), hourly_weights / hourly_weights.sum()
+    
+    def _key_sampler(self, key, table):
+        """AliasSampler over the rows of table for a foreign key, None when uniform"""
+        import numpy as np
+        import pandas as pd
+        
+        spec = self.key_distributions.get(key, 'uniform')
+        name, _, param = spec.partition(':')
+        if name == 'uniform':
+            return None
+        
+        # Popularity ranks and Pareto weights are fixed per (seed, key), not
+        # per chunk or batch, and independent between product, store and customer
+        seed = self.seed if self.key_seed is None else self.key_seed
+        rng = np.random.default_rng(None if seed is None else np.random.SeedSequence([seed, zlib.crc32(key.encode())]))
+        n = len(table)
+        if name == 'zipf':
+            # Shuffle ranks so popularity is not tied to key order (products are grouped by category)
+            weights = 1.0 / (rng.permutation(n) + 1.0) ** float(param or 1.0)
+        elif name == 'pareto':
+            weights = rng.pareto(float(param or 1.16), n) + 1.0
+        elif name == 'weights':
+            table = pd.DataFrame(table)
+            if param not in table.columns:
+                raise ValueError(f"{key} distribution '{spec}': no column '{param}'")
+            column = table[param]
+            if pd.api.types.is_numeric_dtype(column):
+                weights = column.fillna(0).to_numpy(float)
+            else:
+                weights = column.map(self.category_weights.get(param, {})).fillna(1).to_numpy(float)
+            # Keys with no weight (e.g. online stores have 0 square feet) still sell a little
+            positive = weights[weights > 0]
+            if not len(positive):
+                return None
+            weights = np.where(weights > 0, weights, positive.min())
+        else:
+            raise ValueError(f"Unknown {key} distribution '{spec}' (expected uniform, zipf, pareto or weights:<column>)")
+        return AliasSampler(weights)
+    
+    def _draw_keys(self, rng, sampler, num_keys, n):
+        """Row indices for n fact rows: uniform, or from the key's alias table"""
+        if sampler is None:
+            return rng.integers(0, num_keys, n)
+        return sampler.sample(rng, n)
+    
+    def _fact_dimension_arrays(self, dim_products, dim_stores, dim_customers):
+        """Collect the dimension attributes the fact rows read into NumPy arrays"""
+        import numpy as np
+        import pandas as pd
+        
+        dim_products = pd.DataFrame(dim_products)
+        dim_stores = pd.DataFrame(dim_stores)
+        dim_customers = pd.DataFrame(dim_customers)
+        
+        # Seed Faker too so the name pool is part of the reproducible output
+        if self.seed is not None:
+            self.fake.seed_instance(self.seed)
+        
+        # One name per sales_person_id (1000-2000) instead of a Faker call per row,
+        # kept as codes into the distinct names
+        sales_person_names, sales_person_codes = np.unique(
+            np.array([self.fake.name() for _ in range(1001)], dtype=object),
+            return_inverse=True
+        )
+        
+        store_type = pd.Categorical(dim_stores['store_type'], categories=self.store_types).codes
+        return {
+            'products': {
+                'product_id': dim_products['product_id'].to_numpy(np.int32),
+                'unit_price': dim_products['unit_price'].to_numpy(float),
+                'unit_cost': dim_products['unit_cost'].to_numpy(float),
+                'category_name': dim_products['category_name'].to_numpy(object),
+                'discontinued_day': _day_numbers(dim_products['discontinued_date']),
+            },
+            'stores': {
+                'store_id': dim_stores['store_id'].to_numpy(np.int32),
+                'store_type': store_type,
+                'is_online': store_type == self.store_types.index('Online'),
+                'opening_day': _day_numbers(dim_stores['opening_date']),
+                'closing_day': _day_numbers(dim_stores['closing_date']),
+            },
+            'customer_ids': dim_customers['customer_id'].to_numpy(np.int32),
+            'sales_person_names': list(sales_person_names),
+            'sales_person_codes': sales_person_codes,
+            'samplers': {
+                'product': self._key_sampler('product', dim_products),
+                'store': self._key_sampler('store', dim_stores),
+                'customer': self._key_sampler('customer', dim_customers),
+            },
+        }
+    
+    def _fact_sales_batch(self, rng, transaction_times, offset, dims):
+        """Draw one batch of fact sales columns; distributions mirror the python engine
+        
+        Enum-like columns come back as categoricals and timestamps as
+        datetime64, so a row costs a few dozen bytes instead of a dict of
+        Python strings. transaction_times has one timestamp per transaction;
+        with basket_size > 1 the ORDER_HEADER_COLUMNS are drawn once per
+        transaction and repeated on its lines, and the rest once per line.
+        """
+        import numpy as np
+        import pandas as pd
+        
+        products = dims['products']
+        stores = dims['stores']
+        customer_ids = dims['customer_ids']
+        categories = self.fact_categories
+        n = len(transaction_times)
+        seq = pd.Series(np.arange(offset, offset + n)).astype(str).str.zfill(6).to_numpy(dtype=object)
+        days = transaction_times.values.astype('datetime64[D]')
+        
+        # Basket sizes: line k belongs to transaction lines[k], whose first line is starts[...]
+        lines = None
+        num_lines = n
+        line_days = days
+        if self.basket_size > 1:
+            sizes = rng.geometric(1 / self.basket_size, n)
+            starts = np.cumsum(sizes) - sizes
+            lines = np.repeat(np.arange(n), sizes)
+            num_lines = len(lines)
+            line_days = days[lines]
+        
+        # Select random dimension keys (array indexing, no dict lookups);
+        # skewed keys use the alias tables built once per run
+        samplers = dims['samplers']
+        product_idx = self._draw_keys(rng, samplers['product'], len(products['product_id']), num_lines)
+        store_idx = self._draw_keys(rng, samplers['store'], len(stores['store_id']), n)
+        if self.enforce_integrity:
+            product_idx, store_idx = self._redraw_closed_keys(rng, dims, product_idx, store_idx, line_days, days)
+        has_customer = rng.random(n) > 0.2
+        customer_id = np.where(
+            has_customer,
+            customer_ids[self._draw_keys(rng, samplers['customer'], len(customer_ids), n)],
+            np.nan
+        )
+        
+        quantity = rng.integers(1, 6, num_lines, dtype=np.int8)
+        unit_price = products['unit_price'][product_idx]
+        
+        # Apply discount (30% chance)
+        has_discount = rng.random(num_lines) < 0.3
+        discount_percentage = np.where(has_discount, np.round(rng.uniform(5, 25, num_lines), 2), np.nan)
+        discount_amount = np.where(
+            has_discount,
+            np.round(quantity * unit_price * np.nan_to_num(discount_percentage) / 100, 2),
+            0.0
+        )
+        
+        payment_method = _categorical(rng, categories['payment_method'], n)
+        card_codes = [categories['payment_method'].index(m) for m in ['Credit Card', 'Debit Card'] if m in categories['payment_method']]
+        is_card = np.isin(payment_method.codes, card_codes)
+        
+        # Sales channel: online stores always sell online, others pick one of the rest
+        is_online = stores['is_online'][store_idx]
+        channel_codes = rng.integers(0, 3, n).astype(np.int16)
+        channel_codes[is_online] = categories['sales_channel'].index('Online')
+        sales_channel = pd.Categorical.from_codes(channel_codes, categories['sales_channel'])
+        
+        transaction_time = transaction_times.values.astype('datetime64[s]')
+        day_str = transaction_times.strftime('%Y%m%d').to_numpy(dtype=object)
+        has_return_date = rng.random(num_lines) < 0.03
+        return_date = line_days + rng.integers(1, 15, num_lines).astype('timedelta64[D]')
+        sales_person_id = rng.integers(1000, 2001, n, dtype=np.int16)
+        
+        columns = {
+            'time_id': (days - np.datetime64(self.time_origin.date(), 'D')).astype(np.int32) + 1,
+            'product_id': products['product_id'][product_idx],
+            'store_id': stores['store_id'][store_idx],
+            'customer_id': customer_id,
+            'transaction_id': 'TXN-' + transaction_times.strftime('%Y%m%d%H%M%S').to_numpy(dtype=object) + '-' + seq,
+            'sales_person_id': sales_person_id,
+            'sales_person_name': pd.Categorical.from_codes(
+                dims['sales_person_codes'][sales_person_id - 1000],
+                dims['sales_person_names']
+            ),
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'unit_cost': products['unit_cost'][product_idx],
+            'discount_type': pd.Categorical.from_codes(np.where(has_discount, 0, -1), categories['discount_type']),
+            'discount_percentage': discount_percentage,
+            'discount_amount': discount_amount,
+            'promotion_id': _categorical(rng, categories['promotion_id'], num_lines, mask=rng.random(num_lines) > 0.7),
+            'promotion_name': _categorical(rng, categories['promotion_name'], num_lines, mask=rng.random(num_lines) > 0.7),
+            'tax_rate': np.full(num_lines, 10.0),  # Standard VAT in Indonesia
+            'service_fee': np.where(rng.random(n) > 0.8, np.round(rng.uniform(0, 10, n), 2), 0.0),
+            'shipping_fee': np.where(is_online, np.round(rng.uniform(0, 20, n), 2), 0.0),
+            'payment_method': payment_method,
+            'payment_status': _categorical(rng, categories['payment_status'], n, p=[0.6, 0.2, 0.2]),
+            'card_type': _categorical(rng, categories['card_type'], n, mask=is_card),
+            'card_last_four': _categorical(rng, categories['card_last_four'], n, mask=is_card),
+        }
+        columns.update(self._return_columns(rng, num_lines, has_return_date, return_date, unit_price, quantity))
+        columns.update({
+            'sales_channel': sales_channel,
+            'online_order_id': _masked(is_online, 'ONL-' + day_str + '-' + seq),
+            'transaction_time': transaction_time,
+            'source_system': _categorical(rng, categories['source_system'], n),
+            'batch_id': rng.integers(1, INITIAL_BATCHES + 1, n, dtype=np.int8)
+        })
+        if lines is None:
+            return pd.DataFrame(columns)
+        
+        # Broadcast the header onto every line; fees go on the first line only
+        for column in ORDER_HEADER_COLUMNS:
+            columns[column] = columns[column][lines]
+        for column in ORDER_FEES:
+            fee = np.zeros(num_lines)
+            fee[starts] = columns[column]
+            columns[column] = fee
+        df = pd.DataFrame(columns)
+        df.insert(df.columns.get_loc('transaction_id') + 1, 'line_number', (np.arange(num_lines) - starts[lines] + 1).astype(np.int16))
+        return df
+    
+    def _return_columns(self, rng, n, has_return_date, return_date, unit_price, quantity):
+        """is_returned, return_reason, return_date and refund_amount for one batch
+        
+        By default the reason, date and refund are each drawn on their own
+        and can disagree with is_returned; enforce_integrity derives all of
+        them from is_returned. Both draw the same random streams.
+        """
+        import numpy as np
+        
+        is_returned = rng.random(n) < 0.03
+        has_reason = rng.random(n) < 0.03
+        if self.enforce_integrity:
+            has_reason = has_return_date = is_returned
+        return_reason = _categorical(rng, self.fact_categories['return_reason'], n, mask=has_reason)
+        has_refund = rng.random(n) < 0.03
+        refund_amount = np.round(rng.uniform(0, 1, n) * unit_price * quantity, 2)
+        if self.enforce_integrity:
+            has_refund = is_returned
+        return {
+            'is_returned': is_returned,
+            'return_reason': return_reason,
+            'return_date': np.where(has_return_date, return_date, np.datetime64('NaT')).astype('datetime64[s]'),
+            'refund_amount': np.where(has_refund, refund_amount, np.nan),
+        }
+    
+    def _redraw_closed_keys(self, rng, dims, product_idx, store_idx, product_days, store_days):
+        """Redraw the product and store keys of rows sold while discontinued or closed
+        
+        Only the offending rows are redrawn, from the same samplers, so keys
+        keep their distribution among the products and stores open that day.
+        product_days and store_days are the sale days of each key (line
+        items and transactions differ for multi-line baskets).
+        """
+        products = dims['products']
+        stores = dims['stores']
+        samplers = dims['samplers']
+        for _ in range(100):
+            closed_product = product_days > products['discontinued_day'][product_idx]
+            closed_store = (store_days < stores['opening_day'][store_idx]) | (store_days > stores['closing_day'][store_idx])
+            if not (closed_product.any() or closed_store.any()):
+                return product_idx, store_idx
+            product_idx[closed_product] = self._draw_keys(rng, samplers['product'], len(products['product_id']), int(closed_product.sum()))
+            store_idx[closed_store] = self._draw_keys(rng, samplers['store'], len(stores['store_id']), int(closed_store.sum()))
+        raise ValueError("No product on sale in an open store for some transaction days")
+    
     def generate_all_data(self):
         """Generate all dimension and fact data"""
         print("Starting data generation for Retail Sales Star Schema...")
@@ -454,52 +2861,469 @@ class DataGenerator:
         # Create data directory if it doesn't exist
         os.makedirs('data', exist_ok=True)
         
-        # Generate dimension tables
-        dim_time_df = self.generate_dim_time()
-        dim_product_df = self.generate_dim_product()
-        dim_store_df = self.generate_dim_store()
-        dim_customer_df = self.generate_dim_customer()
+        # Load straight into PostgreSQL over one pooled connection
+        if self.output == 'postgres':
+            self.loader = PostgresLoader(self.dsn, self.load_connections)
+            unused = [TIME_GRAINS[grain][0] for grain in TIME_GRAINS if grain not in self._time_grains()]
+            if not self.rollups:
+                unused += list(ROLLUP_KEYS)
+            if not self.order_headers:
+                unused.append('fact_order_header')
+            self.loader.create_tables([table for table in TABLE_SCHEMAS if table not in unused], self.basket_size > 1)
+            try:
+                self._generate_tables()
+                with self._stage('postgres_keys_indexes'):
+                    self.loader.finish()
+            finally:
+                self.loader.close()
+                self.loader = None
+        else:
+            self._generate_tables()
+    
+    def _generate_tables(self):
+        """Generate every table to the output destination and summarize
         
-        # Convert to list of dicts for easier access
-        dim_products = dim_product_df.to_dict('records')
-        dim_stores = dim_store_df.to_dict('records')
-        dim_customers = dim_customer_df.to_dict('records')
+        Tables whose cache key matches data/manifest.json are reused as they are.
+        """
+        manifest = self._load_manifest()
         
-        # Generate fact table
-        fact_sales_df = self.generate_fact_sales(dim_products, dim_stores, dim_customers)
+        # Generate dimension tables
+        dim_time_df, _ = self._generate_cached(manifest, 'dim_time', self.generate_dim_time)
+        grain_rows = {}
+        for grain in self._time_grains():
+            table = TIME_GRAINS[grain][0]
+            df, _ = self._generate_cached(manifest, table, lambda grain=grain: self.generate_dim_time_grain(grain))
+            grain_rows[table] = len(df)
+        dim_product_df, product_key = self._generate_cached(manifest, 'dim_product', self.generate_dim_product)
+        dim_store_df, store_key = self._generate_cached(manifest, 'dim_store', self.generate_dim_store)
+        dim_customer_df, customer_key = self._generate_cached(manifest, 'dim_customer', self.generate_dim_customer)
+        
+        # Generate fact table (only the row count comes back when streaming);
+        # the numpy engine reads the dimensions as arrays, not lists of dicts
+        fact_key = self._cache_key('fact_sales', [product_key, store_key, customer_key])
+        fact_entry = self._cached_entry(manifest, 'fact_sales', fact_key)
+        if fact_entry:
+            print(f"♻️  Reusing fact_sales (unchanged config, see data/manifest.json)")
+            num_fact_rows = fact_entry['rows']
+        else:
+            with self._stage('fact_sales') as stage:
+                fact_sales_df = self.generate_fact_sales(dim_product_df, dim_store_df, dim_customer_df)
+                num_fact_rows = fact_sales_df if self._streams_fact_sales() else len(fact_sales_df)
+                stage['rows'] = num_fact_rows
         
         print("\n" + "="*50)
         print("DATA GENERATION COMPLETE!")
         print("="*50)
-        print(f"Generated files in 'data/' directory:")
-        print(f"  • dim_time.csv: {len(dim_time_df):,} records")
-        print(f"  • dim_product.csv: {len(dim_product_df):,} records")
-        print(f"  • dim_store.csv: {len(dim_store_df):,} records")
-        print(f"  • dim_customer.csv: {len(dim_customer_df):,} records")
-        print(f"  • fact_sales.csv: {len(fact_sales_df):,} records")
+        if self.output == 'postgres':
+            print(f"Loaded tables into PostgreSQL:")
+        else:
+            print(f"Generated files in 'data/' directory:")
+        print(f"  • dim_time: {len(dim_time_df):,} records")
+        for table, rows in grain_rows.items():
+            print(f"  • {table}: {rows:,} records")
+        print(f"  • dim_product: {len(dim_product_df):,} records")
+        print(f"  • dim_store: {len(dim_store_df):,} records")
+        print(f"  • dim_customer: {len(dim_customer_df):,} records")
+        print(f"  • fact_sales: {num_fact_rows:,} records")
+        num_header_rows = self.num_transactions if self.order_headers else 0
+        if self.order_headers:
+            print(f"  • fact_order_header: {num_header_rows:,} records")
         print("\nTotal records generated:", 
-              sum([len(dim_time_df), len(dim_product_df), len(dim_store_df), 
-                   len(dim_customer_df), len(fact_sales_df)]))
+              sum([len(dim_time_df), *grain_rows.values(), len(dim_product_df), len(dim_store_df), 
+                   len(dim_customer_df), num_fact_rows, num_header_rows]))
+        
+        # Later incremental batches continue from here; sequence numbers count
+        # transactions, which differ from fact rows for multi-line baskets
+        self._save_etl_state({
+            'time_origin': self.time_origin.strftime('%Y-%m-%d'),
+            'end_date': self.end_date.strftime('%Y-%m-%d'),
+            'last_transaction_seq': self.num_transactions - 1,
+            'fact_rows': num_fact_rows,
+            'last_batch_id': INITIAL_BATCHES,
+            'rollups': self.rollups,
+            'time_grain': self.time_grain,
+            'basket_size': self.basket_size,
+            'order_headers': self.order_headers
+        })
+        
+        # Generate summary statistics from the accumulator filled during generation
+        if fact_entry:
+            print(f"\n📈 Statistics unchanged: data/data_statistics.csv, data/sales_breakdown.csv")
+        else:
+            with self._stage('summary_statistics'):
+                self.generate_summary_statistics(None, dim_product_df, dim_store_df)
+            self._record_table(manifest, 'fact_sales', fact_key, num_fact_rows)
         
-        # Generate summary statistics
-        self.generate_summary_statistics(fact_sales_df, dim_product_df, dim_store_df)
+        if self.output != 'postgres':
+            self._save_manifest(manifest)
+    
+    def generate_incremental(self, start_date=None, end_date=None, num_transactions=None, scd_update_rate=0.0):
+        """Append one daily-style batch of fact_sales rows to existing output
+        
+        Dimensions are read back from data/ instead of being regenerated, and
+        transaction sequence and batch_id numbering continue from
+        data/etl_state.json. The window defaults to the day after the last
+        batch, and num_transactions to this generator's transactions per
+        day over the window. With scd_update_rate > 0 that fraction of customers get a
+        new segment, city and loyalty balance (SCD type 1 overwrite).
+        """
+        import numpy as np
+        import pandas as pd
+        
+        if self.output == 'postgres':
+            raise ValueError("incremental mode appends to data/ files; use output='csv' or 'parquet'")
+        
+        state = self._load_etl_state()
+        if self.rollups and not state.get('rollups'):
+            raise ValueError("rollup tables can only be kept up to date if the initial load generated them")
+        if start_date is None:
+            start_date = (datetime.strptime(state['end_date'], '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+        
+        # Work on a copy so this generator's own config is untouched
+        batch = copy.copy(self)
+        batch.start_date = datetime.strptime(start_date, '%Y-%m-%d')
+        batch.end_date = datetime.strptime(end_date or start_date, '%Y-%m-%d')
+        batch.time_origin = datetime.strptime(state['time_origin'], '%Y-%m-%d')
+        if not num_transactions:
+            # Same daily rate as a full run over start_date..end_date
+            range_days = (self.end_date - self.start_date).days + 1
+            window_days = (batch.end_date - batch.start_date).days + 1
+            num_transactions = max(round(self.num_transactions * window_days / range_days), 1)
+        batch.num_transactions = num_transactions
+        # Finer time keys, line numbers and order headers follow the initial load
+        batch.time_grain = state.get('time_grain', 'day')
+        batch.basket_size = state.get('basket_size', 1)
+        batch.order_headers = state.get('order_headers', False)
+        batch_id = state['last_batch_id'] + 1
+        first_seq = state['last_transaction_seq'] + 1
+        
+        # Same seed, different stream per batch; key popularity stays put
+        if self.seed is not None:
+            batch.key_seed = self.seed if self.key_seed is None else self.key_seed
+            batch.seed = int(np.random.SeedSequence([self.seed, batch_id]).generate_state(1)[0])
+        batch._seed_table('fact_sales')
+        changed = ['fact_sales']
+        
+        print(f"Appending batch {batch_id}: {batch.start_date.date()} to {batch.end_date.date()}")
+        
+        # Extend dim_time through the end of the window
+        dim_time_df = self._read_table('dim_time')
+        last_date = datetime.strptime(dim_time_df['full_date'].max(), '%Y-%m-%d')
+        if batch.end_date > last_date:
+            new_dates = pd.date_range(last_date + timedelta(days=1), batch.end_date)
+            dim_time_df = pd.concat([dim_time_df, batch._dim_time_frame(new_dates)], ignore_index=True)
+            self._write_table('dim_time', dim_time_df)
+            changed.append('dim_time')
+            print(f"Added {len(new_dates)} time dimension records")
+            for grain in batch._time_grains():
+                table = TIME_GRAINS[grain][0]
+                self._write_table(table, pd.concat([self._read_table(table), batch._time_grain_frame(grain, new_dates)], ignore_index=True))
+                changed.append(table)
+        
+        dim_product_df = self._read_table('dim_product')
+        dim_store_df = self._read_table('dim_store')
+        dim_customer_df = self._read_table('dim_customer')
+        
+        if scd_update_rate:
+            dim_customer_df, num_updated = batch._apply_customer_updates(dim_customer_df, scd_update_rate)
+            self._write_table('dim_customer', dim_customer_df)
+            changed.append('dim_customer')
+            print(f"Updated {num_updated} customer dimension records")
+        
+        if batch.engine == 'numpy':
+            chunks = batch._iter_fact_sales_numpy(dim_product_df, dim_store_df, dim_customer_df, first_seq)
+        else:
+            chunks = batch._iter_fact_sales_python(dim_product_df, dim_store_df, dim_customer_df, first_seq)
+        
+        # Rollups written by the initial load are kept in step with every batch
+        batch.rollups = state.get('rollups', False)
+        rollups = batch._new_sales_rollups(dim_product_df['product_id'], dim_product_df['category_name'])
+        if rollups:
+            for table in ROLLUP_KEYS:
+                rollups.add_table(table, self._read_table(table))
+        
+        # Part-file CSV output has no fact_sales.csv to append to, so the
+        # batch gets part files of its own, each with a header
+        batch_part_files = self.output == 'csv' and not os.path.exists('data/fact_sales.csv')
+        
+        num_rows = 0
+        for chunk_index, df in enumerate(chunks):
+            df['batch_id'] = batch_id
+            batch._add_derived_columns(df)
+            for table, frame in batch._fact_table_chunks(df).items():
+                if batch_part_files:
+                    path = f'data/{table}.part-batch{batch_id:05d}.csv'
+                    bytes_before = _path_size(path) if chunk_index else 0
+                    frame.to_csv(
+                        path,
+                        mode='a' if chunk_index else 'w',
+                        header=chunk_index == 0,
+                        index=False,
+                        quoting=csv.QUOTE_NONNUMERIC
+                    )
+                    self._record_written(path, bytes_before)
+                else:
+                    batch._write_table(table, frame, append=True, part=f'batch{batch_id:05d}-{chunk_index:05d}')
+            if rollups:
+                rollups.update(df)
+            num_rows += len(df)
+        
+        self._save_etl_state({
+            'time_origin': state['time_origin'],
+            'end_date': max(batch.end_date.strftime('%Y-%m-%d'), state['end_date']),
+            'last_transaction_seq': first_seq + batch.num_transactions - 1,
+            'fact_rows': state.get('fact_rows', first_seq) + num_rows,
+            'last_batch_id': batch_id,
+            'rollups': batch.rollups,
+            'time_grain': batch.time_grain,
+            'basket_size': batch.basket_size,
+            'order_headers': batch.order_headers
+        })
+        print(f"Appended {num_rows} sales fact records as batch {batch_id}")
+        batch._write_rollups(rollups)
+        
+        # Tables changed in place no longer match their cached config
+        manifest = self._load_manifest()
+        for table in changed:
+            manifest['tables'].pop(table, None)
+        self._save_manifest(manifest)
+        return num_rows
+    
+    def _apply_customer_updates(self, dim_customer_df, rate):
+        """Overwrite segment, location and loyalty for a random fraction of customers"""
+        import numpy as np
+        
+        rng = np.random.default_rng(self.seed)
+        rows = rng.choice(len(dim_customer_df), int(len(dim_customer_df) * rate), replace=False)
+        
+        # Same segment mix as generate_dim_customer
+        segments = [('Premium', 'Platinum'), ('Gold', 'Gold'), ('Silver', 'Silver'), ('Regular', 'Bronze')]
+        picks = rng.choice(len(segments), len(rows), p=[0.05, 0.1425, 0.24225, 0.56525])
+        cities = np.asarray(self.indonesian_cities, dtype=object)[rng.integers(0, len(self.indonesian_cities), len(rows))]
+        
+        df = dim_customer_df.copy()
+        df.loc[rows, 'customer_segment'] = [segments[k][0] for k in picks]
+        df.loc[rows, 'customer_tier'] = [segments[k][1] for k in picks]
+        df.loc[rows, 'city'] = cities
+        df.loc[rows, 'state_province'] = [self.regions[city] for city in cities]
+        df.loc[rows, 'loyalty_points'] = rng.integers(0, 5001, len(rows)).astype(df['loyalty_points'].dtype)
+        return df, len(rows)
+    
+    def _read_table(self, table):
+        """Read a previously generated dimension table back from data/"""
+        import pandas as pd
+        
+        if self.output == 'parquet':
+            import pyarrow.parquet as pq
+            
+            df = pq.read_table(f'data/{table}.parquet').to_pandas(date_as_object=False)
+            # Dates come back typed; keep them as ISO strings, as generated
+            for column in df.columns:
+                if df[column].dtype.kind == 'M':
+                    df[column] = df[column].dt.strftime('%Y-%m-%d')
+            return df
+        return pd.read_csv(f'data/{table}.csv')
+    
+    def _cache_key(self, table, depends=()):
+        """Hash of everything table's output depends on, or None when it cannot be cached
+        
+        depends lists the cache keys of the tables it is built from.
+        """
+        if not self.cache or self.seed is None or self.output == 'postgres':
+            return None
+        config = {
+            'table': table,
+            'version': GENERATOR_VERSION,
+            'seed': self.seed,
+            'output': self.output,
+            'faker_pool_size': self.faker_pool_size,
+            'depends': list(depends),
+        }
+        if table == 'dim_time' or table in [grain_table for grain_table, _, _ in TIME_GRAINS.values()]:
+            config['dates'] = [str(self.start_date.date()), str(self.end_date.date()), str(self.time_origin.date())]
+            config['holidays'] = self.holiday_calendar.fingerprint()
+        elif table == 'fact_sales':
+            config.update({
+                'dates': [str(self.start_date.date()), str(self.end_date.date()), str(self.time_origin.date())],
+                'engine': self.engine,
+                'num_transactions': self.num_transactions,
+                'chunk_size': self.chunk_size,
+                # Sharded output depends on the shard count, not the worker count
+                'shards': self._fact_shards(),
+                'part_files': self.part_files,
+                'weights': [self.weekday_weights, self.hourly_weights],
+                'key_distributions': self.key_distributions,
+                'category_weights': self.category_weights,
+                'rollups': self.rollups,
+                'time_grain': self.time_grain,
+                'enforce_integrity': self.enforce_integrity,
+                'basket_size': self.basket_size,
+                'order_headers': self.order_headers,
+            })
+        else:
+            config['size'] = {'dim_product': self.num_products, 'dim_store': self.num_stores, 'dim_customer': self.num_customers}[table]
+            config['reference_date'] = str(self._today())
+            if table == 'dim_customer':
+                config['enforce_integrity'] = self.enforce_integrity
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+    
+    def _table_files(self, table):
+        """Output files that make up a table (fact_sales includes its order headers, rollups and statistics)"""
+        if table != 'fact_sales':
+            return [f'data/{table}.{self.output}']
+        paths = []
+        for fact_table in ('fact_sales', 'fact_order_header'):
+            paths += glob.glob(f'data/{fact_table}.csv') + glob.glob(f'data/{fact_table}.part-*.csv')
+            paths += glob.glob(f'data/{fact_table}/**/*.parquet', recursive=True)
+        paths += [path for table in ROLLUP_KEYS for path in glob.glob(f'data/{table}.{self.output}')]
+        paths += ['data/data_statistics.csv', 'data/sales_breakdown.csv']
+        return sorted(path for path in paths if os.path.exists(path))
+    
+    def _load_manifest(self):
+        try:
+            with open('data/manifest.json') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'tables': {}}
+    
+    def _save_manifest(self, manifest):
+        with open('data/manifest.json', 'w') as f:
+            json.dump(manifest, f, indent=2)
+    
+    def _cached_entry(self, manifest, table, key):
+        """The manifest entry for table if key matches and its files are intact"""
+        entry = manifest['tables'].get(table)
+        if key is None or not entry or entry['key'] != key:
+            return None
+        for path, info in entry['files'].items():
+            if not os.path.exists(path) or os.path.getsize(path) != info['bytes'] or _file_sha256(path) != info['sha256']:
+                return None
+        return entry
+    
+    def _record_table(self, manifest, table, key, rows):
+        """Checksum a freshly written table into the manifest"""
+        if key is None:
+            return
+        manifest['tables'][table] = {
+            'key': key,
+            'rows': int(rows),
+            'files': {
+                path: {'bytes': os.path.getsize(path), 'sha256': _file_sha256(path)}
+                for path in self._table_files(table)
+            },
+            'created_at': datetime.now().isoformat(timespec='seconds')
+        }
+    
+    def _generate_cached(self, manifest, table, build):
+        """Reuse table from the manifest when its key is unchanged, else build and record it"""
+        key = self._cache_key(table)
+        if self._cached_entry(manifest, table, key):
+            print(f"♻️  Reusing {table} (unchanged config, see data/manifest.json)")
+            return self._read_table(table), key
+        with self._stage(table) as stage:
+            df = build()
+            stage['rows'] = len(df)
+        self._record_table(manifest, table, key, len(df))
+        return df, key
+    
+    def _load_etl_state(self):
+        """Sequence and batch counters left by the last full or incremental run"""
+        with open('data/etl_state.json') as f:
+            return json.load(f)
+    
+    def _save_etl_state(self, state):
+        with open('data/etl_state.json', 'w') as f:
+            json.dump(state, f, indent=2)
+    
+    def _iter_output_fact_chunks(self):
+        """Read fact_sales back from data/ in chunks of chunk_size rows"""
+        import pandas as pd
+        
+        if self.output == 'parquet':
+            import pyarrow.dataset as ds
+            
+            for batch in ds.dataset('data/fact_sales', format='parquet').to_batches(batch_size=self.chunk_size):
+                yield batch.to_pandas()
+            return
+        for path in sorted(glob.glob('data/fact_sales.csv') + glob.glob('data/fact_sales.part-*.csv')):
+            yield from pd.read_csv(path, chunksize=self.chunk_size)
+    
+    def validate_output(self):
+        """Check the fact_sales output in data/ against INTEGRITY_RULES, chunk by chunk
+        
+        Prints the violations per rule and returns the report, which is also
+        saved to data/integrity_report.json.
+        """
+        if self.output == 'postgres':
+            raise ValueError("validation reads the csv or parquet output in data/")
+        print("\n🔍 Validating generated data...")
+        # Incremental batches extend the date range and row count
+        state = self._load_etl_state()
+        validator = IntegrityValidator(
+            self._read_table('dim_product'),
+            self._read_table('dim_store'),
+            self._read_table('dim_customer'),
+            datetime.strptime(state['time_origin'], '%Y-%m-%d'),
+            max(datetime.strptime(state['end_date'], '%Y-%m-%d'), self.end_date)
+        )
+        progress = Progress(state.get('fact_rows', state['last_transaction_seq'] + 1), 'fact_sales rows checked', self.progress)
+        for df in self._iter_output_fact_chunks():
+            validator.update(df)
+            progress.update(len(df))
+        progress.close()
+        
+        report = validator.report()
+        print(f"\n🔍 Integrity Check ({report['rows']:,} fact rows, {report['rows_per_sec'] or 0:,.0f} rows/sec):")
+        for rule, result in report['violations'].items():
+            if result['rows']:
+                print(f"  ❌ {rule}: {result['rows']:,} rows, e.g. {result['example']} ({result['description']})")
+            else:
+                print(f"  ✅ {rule}")
+        with open('data/integrity_report.json', 'w') as f:
+            json.dump(report, f, indent=2)
+        self._record_written('data/integrity_report.json')
+        print(f"\n📈 Integrity report saved to: data/integrity_report.json")
+        return report
     
     def generate_summary_statistics(self, fact_sales, dim_products, dim_stores):
-        """Generate summary statistics of the generated data"""
+        """Generate summary statistics of the generated data
+        
+        Pass fact_sales=None to use the accumulator filled while generating;
+        a DataFrame is folded into a fresh accumulator in one pass.
+        """
+        import pandas as pd
+        
         print("\n" + "="*50)
         print("DATA SUMMARY STATISTICS")
         print("="*50)
         
         # Sales statistics
-        total_revenue = fact_sales['total_amount'].sum()
-        avg_transaction = fact_sales['total_amount'].mean()
-        total_transactions = len(fact_sales)
+        sales = self.sales_statistics
+        if fact_sales is not None:
+            sales = self._new_sales_statistics(dim_products['product_id'], dim_products['category_name'])
+            sales.update(fact_sales)
+        
+        total_revenue = sales.total_revenue
+        total_discount = sales.total_discount
+        total_transactions = sales.transactions
+        avg_transaction = total_revenue / total_transactions if total_transactions else float('nan')
+        distinct_customers = sales.customers.count()
         
         print(f"\n📊 Sales Statistics:")
         print(f"  Total Revenue: Rp {total_revenue:,.2f}")
         print(f"  Total Transactions: {total_transactions:,}")
         print(f"  Average Transaction Value: Rp {avg_transaction:,.2f}")
-        print(f"  Total Discount Given: Rp {fact_sales['discount_amount'].sum():,.2f}")
+        print(f"  Total Discount Given: Rp {total_discount:,.2f}")
+        print(f"  Distinct Customers (approx.): {distinct_customers:,}")
+        print(f"  Revenue by Category:")
+        for row in sales.breakdown('category').itertuples():
+            print(f"    • {row.key}: Rp {row.revenue:,.2f} ({row.transactions:,} transactions)")
+        print(f"  Revenue by Channel:")
+        for row in sales.breakdown('channel').itertuples():
+            print(f"    • {row.key}: Rp {row.revenue:,.2f} ({row.transactions:,} transactions)")
+        print(f"  Top Stores by Revenue:")
+        for row in sales.breakdown('store').head(5).itertuples():
+            print(f"    • store {row.key}: Rp {row.revenue:,.2f} ({row.transactions:,} transactions)")
         
         # Product statistics
         print(f"\n📦 Product Statistics:")
@@ -524,6 +3348,8 @@ class DataGenerator:
             'total_revenue': total_revenue,
             'total_transactions': total_transactions,
             'avg_transaction_value': avg_transaction,
+            'total_discount': total_discount,
+            'distinct_customers_approx': distinct_customers,
             'total_products': len(dim_products),
             'active_products': int(dim_products['is_active'].astype(int).sum()),
             'total_stores': len(dim_stores),
@@ -532,36 +3358,193 @@ class DataGenerator:
         
         stats_df = pd.DataFrame([stats])
         stats_df.to_csv('data/data_statistics.csv', index=False)
-        print(f"\n📈 Statistics saved to: data/data_statistics.csv")
+        self._record_written('data/data_statistics.csv')
+        
+        breakdown_df = pd.concat(
+            [sales.breakdown(name).assign(breakdown=name) for name in ('category', 'store', 'channel')],
+            ignore_index=True
+        )[['breakdown', 'key', 'transactions', 'revenue']]
+        breakdown_df.to_csv('data/sales_breakdown.csv', index=False)
+        self._record_written('data/sales_breakdown.csv')
+        print(f"\n📈 Statistics saved to: data/data_statistics.csv, data/sales_breakdown.csv")
+
+
+def parse_args(argv=None):
+    """Command-line options for the data generator"""
+    parser = argparse.ArgumentParser(description='Generate dummy data for the Retail Sales star schema')
+    parser.add_argument('--scale-factor', '--sf', type=float, default=1,
+                        help='scale all tables together; SF1 = 500 products, 25 stores, '
+                             '5,000 customers, 50,000 transactions (default 1)')
+    parser.add_argument('--transactions', type=int,
+                        help='override the number of transactions (fact_sales rows, unless --basket-size is above 1); '
+                             'with --incremental, the batch size (default: the daily rate of a full run)')
+    parser.add_argument('--start-date', default='2023-01-01')
+    parser.add_argument('--end-date', default='2024-02-28')
+    parser.add_argument('--engine', choices=['python', 'numpy'], default='numpy')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--workers', type=int, default=1, help='processes for fact generation (numpy engine)')
+    parser.add_argument('--shards', type=int, help='fact shards; output is reproducible per (seed, shards)')
+    parser.add_argument('--chunk-size', type=int, default=100000)
+    parser.add_argument('--streaming', action='store_true', help='do not keep fact rows in memory')
+    parser.add_argument('--part-files', action='store_true', help='write fact_sales as numbered part files')
+    parser.add_argument('--output', choices=['csv', 'parquet', 'postgres'], default='csv')
+    parser.add_argument('--dsn', help='PostgreSQL connection string (default: $DATABASE_URL)')
+    parser.add_argument('--load-connections', type=int, default=1,
+                        help='PostgreSQL output: concurrent COPY connections')
+    parser.add_argument('--load-partition', choices=['batch_id', 'month'], default='batch_id',
+                        help='how fact_sales is split across load connections')
+    parser.add_argument('--faker-pool-size', type=int, default=1000, help='distinct Faker values per kind; 0 disables pooling')
+    for key in ('product', 'store', 'customer'):
+        parser.add_argument(f'--{key}-dist', default='uniform',
+                            help=f'{key} key distribution: uniform, zipf[:s], pareto[:alpha] or weights:<column>')
+    parser.add_argument('--time-grain', choices=['day', 'hour', 'minute'], default='day',
+                        help='also write dim_time_hour (hour) and dim_time_minute (minute), keyed from fact_sales')
+    parser.add_argument('--holidays', help='CSV of extra holidays (date, name columns) for dim_time')
+    parser.add_argument('--rollups', action='store_true',
+                        help='also write agg_sales_daily_store, agg_sales_daily_product and agg_sales_monthly_category')
+    parser.add_argument('--basket-size', type=float, default=1,
+                        help='mean line items per transaction (numpy engine); 1 keeps one product per transaction')
+    parser.add_argument('--order-headers', action='store_true',
+                        help='also write fact_order_header with one row per transaction')
+    parser.add_argument('--enforce-integrity', action='store_true',
+                        help='draw only rows that pass the --validate checks')
+    parser.add_argument('--validate', action='store_true',
+                        help='check fact_sales in data/ against the dimensions afterwards; exit 1 on violations')
+    parser.add_argument('--incremental', action='store_true', help='append one fact batch to existing output')
+    parser.add_argument('--window-start', help='first day of the incremental batch (default: day after the last one)')
+    parser.add_argument('--window-end', help='last day of the incremental batch (default: window start)')
+    parser.add_argument('--scd-update-rate', type=float, default=0.0, help='fraction of customers to update per batch')
+    parser.add_argument('--no-cache', action='store_true', help='rebuild every table even if data/manifest.json matches')
+    parser.add_argument('--reference-date', help="date used as 'today' in the dimensions (default: today)")
+    parser.add_argument('--metrics', help='write per-stage timings, throughput and memory to this JSON file')
+    parser.add_argument('--profile', choices=['cprofile', 'tracemalloc'],
+                        help='profile each stage (cProfile files go to data/profiles/)')
+    parser.add_argument('--no-progress', action='store_true', help='do not print progress lines')
+    parser.add_argument('--dry-run', action='store_true', help='print the size and runtime estimate and exit')
+    args = parser.parse_args(argv)
+    if args.validate and args.output == 'postgres':
+        parser.error('--validate reads the csv or parquet output')
+    if args.basket_size < 1:
+        parser.error('--basket-size must be at least 1')
+    if args.basket_size > 1 and args.engine != 'numpy':
+        parser.error('--basket-size above 1 requires --engine numpy')
+    return args
+
+
+def report_metrics(generator, path=None):
+    """Print the stage timings and optionally save them as JSON"""
+    generator.instrumentation.print_summary()
+    if path:
+        generator.instrumentation.write_json(path)
+        print(f"📈 Stage metrics saved to: {path}")
+
 
+def validate(generator):
+    """Run the integrity check as its own stage; True when it found no violations"""
+    with generator._stage('integrity_check') as stage:
+        report = generator.validate_output()
+        stage['rows'] = report['rows']
+    return not any(result['rows'] for result in report['violations'].values())
 
-def main():
+
+def main(argv=None):
     """Main function to run data generation"""
+    args = parse_args(argv)
+    
     print("Retail Sales Data Mart - Data Generator")
     print("="*50)
     
     # Initialize generator
     generator = DataGenerator(
-        start_date='2023-01-01',
-        end_date='2024-02-28'
+        start_date=args.start_date,
+        end_date=args.end_date,
+        engine=args.engine,
+        seed=args.seed,
+        scale_factor=args.scale_factor
     )
+    if args.transactions:
+        generator.num_transactions = args.transactions
+    generator.num_workers = args.workers
+    generator.num_shards = args.shards
+    generator.chunk_size = args.chunk_size
+    generator.streaming = args.streaming
+    generator.part_files = args.part_files
+    generator.output = args.output
+    if args.dsn:
+        generator.dsn = args.dsn
+    generator.faker_pool_size = args.faker_pool_size
+    generator.rollups = args.rollups
+    generator.time_grain = args.time_grain
+    generator.enforce_integrity = args.enforce_integrity
+    generator.basket_size = args.basket_size
+    generator.order_headers = args.order_headers
+    if args.holidays:
+        generator.holiday_calendar = generator.holiday_calendar.with_csv(args.holidays)
+    generator.cache = not args.no_cache
+    generator.instrumentation = Instrumentation(profile=args.profile)
+    generator.progress = not args.no_progress
+    if args.reference_date:
+        generator.reference_date = datetime.strptime(args.reference_date, '%Y-%m-%d').date()
+    generator.load_connections = args.load_connections
+    generator.load_partition = args.load_partition
+    generator.key_distributions = {
+        'product': args.product_dist,
+        'store': args.store_dist,
+        'customer': args.customer_dist
+    }
+    
+    generator.print_estimate()
+    if args.dry_run:
+        return
+    
+    if args.incremental:
+        with generator._stage('incremental_batch') as stage:
+            stage['rows'] = generator.generate_incremental(
+                start_date=args.window_start,
+                end_date=args.window_end,
+                num_transactions=args.transactions,
+                scd_update_rate=args.scd_update_rate
+            )
+        valid = validate(generator) if args.validate else True
+        report_metrics(generator, args.metrics)
+        if not valid:
+            sys.exit(1)
+        return
     
     # Generate all data
     generator.generate_all_data()
+    valid = validate(generator) if args.validate else True
+    report_metrics(generator, args.metrics)
     
     print("\n✅ Data generation completed successfully!")
+    if args.output == 'postgres':
+        return
+    
+    ext = args.output
     print("\n📁 Files generated in 'data/' directory:")
-    print("  1. dim_time.csv        - Time dimension")
-    print("  2. dim_product.csv     - Product dimension")
-    print("  3. dim_store.csv       - Store dimension")
-    print("  4. dim_customer.csv    - Customer dimension")
-    print("  5. fact_sales.csv      - Sales fact table")
+    print(f"  1. dim_time.{ext}        - Time dimension")
+    print(f"  2. dim_product.{ext}     - Product dimension")
+    print(f"  3. dim_store.{ext}       - Store dimension")
+    print(f"  4. dim_customer.{ext}    - Customer dimension")
+    print(f"  5. fact_sales{'/' if ext == 'parquet' else '.csv'}      - Sales fact table")
     print("  6. data_statistics.csv - Summary statistics")
+    print("  7. sales_breakdown.csv - Revenue by category, store, channel")
+    for grain in generator._time_grains():
+        print(f"  •  {TIME_GRAINS[grain][0]}.{ext} - Time dimension by {grain}")
+    if args.order_headers:
+        print(f"  •  fact_order_header{'/' if ext == 'parquet' else '.csv'} - One row per fact_sales transaction")
+    if args.rollups:
+        for table in ROLLUP_KEYS:
+            print(f"  •  {table}.{ext} - Rollup of fact_sales")
     
     print("\n🚀 Next steps:")
     print("  1. Run create_tables.sql in PostgreSQL")
     print("  2. Load CSV files using COPY command")
     print("  3. Run analytical queries on the star schema")
+    
+    if not valid:
+        print("\n❌ Generated data failed the integrity check (see data/integrity_report.json)")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,140 @@
+"""
+Tests for IntegrityValidator: one row breaking each rule in INTEGRITY_RULES
+Run with: python -m pytest -q
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from generate_dummy_data import DIMENSION_RULES, INTEGRITY_RULES, IntegrityValidator
+
+TIME_ORIGIN = datetime(2023, 1, 1)
+LAST_DAY = datetime(2023, 1, 31)
+
+
+def dimensions():
+    """Products, stores and customers with exactly one bad referral and one self-referral"""
+    products = pd.DataFrame({
+        'product_id': [1, 2],
+        'discontinued_date': [None, '2023-01-10'],
+    })
+    stores = pd.DataFrame({
+        'store_id': [1, 2],
+        'opening_date': ['2020-01-01', '2023-01-05'],
+        'closing_date': [None, '2023-01-20'],
+    })
+    customers = pd.DataFrame({
+        'customer_id': [1, 2, 3, 4],
+        'referred_by_id': [np.nan, 1, 99, 4],
+    })
+    return products, stores, customers
+
+
+def fact_row(transaction_id, day=15, hour=12, **fields):
+    """A fact row passing every rule; fields override it, amounts follow the overrides"""
+    row = {
+        'transaction_id': transaction_id,
+        'transaction_time': f'2023-01-{day:02d} {hour:02d}:30:00',
+        'product_id': 1,
+        'store_id': 1,
+        'customer_id': 1.0,
+        'quantity': 2,
+        'unit_price': 10.0,
+        'discount_amount': 0.0,
+        'tax_rate': 10.0,
+        'service_fee': 1.0,
+        'shipping_fee': 0.0,
+        'time_id': day,
+        'hour_id': (day - 1) * 24 + hour + 1,
+        'is_returned': False,
+        'return_date': None,
+        'return_reason': None,
+        'refund_amount': np.nan,
+    }
+    row.update(fields)
+    row.setdefault('total_amount', row['quantity'] * row['unit_price'])
+    row.setdefault('net_amount', row['total_amount'] - row['discount_amount'])
+    row.setdefault('tax_amount', row['net_amount'] * row['tax_rate'] / 100)
+    row.setdefault('gross_amount', row['net_amount'] + row['tax_amount'] + row['service_fee'] + row['shipping_fee'])
+    return row
+
+
+def returned(day=15):
+    """Return fields of a valid return of a sale on day"""
+    return {
+        'is_returned': True,
+        'return_date': f'2023-01-{day + 3:02d}',
+        'return_reason': 'Defective',
+        'refund_amount': 5.0,
+    }
+
+
+# The fact rule each row breaks, and the row that breaks it
+BROKEN_ROWS = {
+    'product_fk': fact_row('TXN-PRODUCT', product_id=99),
+    'store_fk': fact_row('TXN-STORE', store_id=99),
+    'customer_fk': fact_row('TXN-CUSTOMER', customer_id=99.0),
+    'total_amount': fact_row('TXN-TOTAL', total_amount=21.0),
+    'net_amount': fact_row('TXN-NET', net_amount=19.0),
+    'tax_amount': fact_row('TXN-TAX', tax_amount=5.0),
+    'gross_amount': fact_row('TXN-GROSS', gross_amount=0.0),
+    'discount_amount': fact_row('TXN-DISCOUNT', discount_amount=-1.0),
+    'refund_amount': fact_row('TXN-REFUND', **{**returned(), 'refund_amount': 100.0}),
+    'time_id': fact_row('TXN-TIME-ID', time_id=3),
+    'time_keys': fact_row('TXN-HOUR', hour_id=1),
+    'transaction_time': fact_row('TXN-TIME', transaction_time='2023-02-15 12:30:00', time_id=46, hour_id=45 * 24 + 13),
+    'return_date': fact_row('TXN-RETURN', **{**returned(), 'return_date': '2023-01-15'}),
+    'return_flags': fact_row('TXN-FLAGS', is_returned=True),
+    'discontinued_product': fact_row('TXN-DISCONTINUED', product_id=2),
+    'closed_store': fact_row('TXN-CLOSED', day=2, store_id=2),
+}
+
+
+def fact_chunk():
+    """Valid rows (one of them returned) followed by one row per broken rule"""
+    valid = [fact_row('TXN-OK-1'), fact_row('TXN-OK-2', day=20, hour=0), fact_row('TXN-OK-3', **returned())]
+    return pd.DataFrame(valid + list(BROKEN_ROWS.values()))
+
+
+def validator():
+    return IntegrityValidator(*dimensions(), TIME_ORIGIN, LAST_DAY)
+
+
+def test_every_rule_is_covered():
+    assert set(BROKEN_ROWS) | set(DIMENSION_RULES) == set(INTEGRITY_RULES)
+
+
+def test_valid_rows_pass():
+    checker = validator()
+    checker.update(fact_chunk().head(3))
+    violations = checker.report()['violations']
+    assert {rule for rule, result in violations.items() if result['rows']} == set(DIMENSION_RULES)
+
+
+def test_each_rule_broken_once():
+    checker = validator()
+    checker.update(fact_chunk())
+    report = checker.report()
+    assert report['rows'] == 3 + len(BROKEN_ROWS)
+    assert {rule: result['rows'] for rule, result in report['violations'].items()} == {rule: 1 for rule in INTEGRITY_RULES}
+    for rule, row in BROKEN_ROWS.items():
+        assert report['violations'][rule]['example'] == row['transaction_id']
+    assert report['violations']['referred_by_fk']['example'] == '3'
+    assert report['violations']['self_referral']['example'] == '4'
+
+
+def test_merge_matches_a_single_pass():
+    chunk = fact_chunk()
+    single = validator()
+    single.update(chunk)
+    
+    first, second = validator(), validator()
+    first.update(chunk.iloc[:8])
+    second.update(chunk.iloc[8:])
+    first.merge(second)
+    
+    assert first.rows == single.rows
+    assert first.violations == single.violations
+    assert first.examples == single.examples